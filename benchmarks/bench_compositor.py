@@ -0,0 +1,58 @@
+"""Compare moviepy's CompositeVideoClip against the Timeline's integer compositor on the quiz layout.
+
+The background moves every frame, so neither path can reuse a cached base frame.
+
+Usage: python benchmarks/bench_compositor.py [frames]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from moviepy.editor import VideoClip, CompositeVideoClip
+import video_maker as vm
+
+
+def quiz_layers(duration):
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, (vm.RESOLUTION[1], vm.RESOLUTION[0], 3), dtype=np.uint8)
+    background = VideoClip(lambda t: np.roll(noise, int(t * vm.FPS), axis=1), duration=duration)
+    question = vm.create_text_with_shadow("Who directed Inception?\n\nA. Steven Spielberg\nB. Christopher Nolan\n"
+                                          "C. James Cameron\nD. Quentin Tarantino", 'Arial', 'white', vm.FONT_SIZE - 5)
+    return [background, vm.sprite_clip(question).set_duration(duration), vm.create_countdown_clip(duration),
+            vm.load_logo({'logo': os.path.join(os.path.dirname(vm.__file__), 'inputs', 'moviecity-logo.jpg')})]
+
+
+def bench(clip, frames):
+    clip.get_frame(0)  # warm-up
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(frames):
+        clip.get_frame(i / vm.FPS)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / frames * 1000, peak
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 90
+    duration = frames / vm.FPS + 1
+    vm.overlay_cache.cache_dir = None
+
+    layers = [layer for layer in quiz_layers(duration) if layer is not None]
+    composite = CompositeVideoClip([layer.set_duration(duration) for layer in layers], size=vm.RESOLUTION)
+    timeline = vm.Timeline()
+    for layer in quiz_layers(duration):
+        if layer is not None:
+            timeline.add(layer, 0, duration)
+    timeline_clip = timeline.to_clip()
+
+    composite_ms, composite_peak = bench(composite, frames)
+    timeline_ms, timeline_peak = bench(timeline_clip, frames)
+    print(f"CompositeVideoClip:  {composite_ms:6.1f} ms/frame, {composite_peak / 1e6:6.1f} MB peak allocations")
+    print(f"Timeline (integer):  {timeline_ms:6.1f} ms/frame, {timeline_peak / 1e6:6.1f} MB peak allocations")
+    print(f"speed-up: {composite_ms / timeline_ms:.2f}x")
@@ -0,0 +1,73 @@
+"""Compare per-frame compositing of full-frame overlays against tight sprites on the quiz layout.
+
+Usage: python benchmarks/bench_overlay_sprites.py [frames]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from moviepy.editor import ColorClip, ImageClip, CompositeVideoClip
+import numpy as np
+from PIL import Image, ImageDraw
+import video_maker as vm
+
+
+def sprite_to_frame(sprite):
+    """Paste a sprite back onto a transparent full-frame canvas, as overlays were drawn before sprites."""
+    img = np.zeros((vm.RESOLUTION[1], vm.RESOLUTION[0], 4), dtype=np.uint8)
+    x, y = sprite.position
+    h, w = sprite.image.shape[:2]
+    img[y:y + h, x:x + w] = sprite.image
+    return img
+
+
+def circular_timer(time_left):
+    """One frame of the old per-second timer overlay (the renderer now uses vm.create_countdown_clip)."""
+    img = Image.new('RGBA', vm.RESOLUTION, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    center_x, center_y = vm.RESOLUTION[0] // 2, vm.px(vm.TIMER_CENTER_Y)
+    radius = vm.px(vm.TIMER_RADIUS)
+    draw.ellipse([center_x - radius, center_y - radius, center_x + radius, center_y + radius],
+                 fill=(0, 0, 0, 180), outline=vm.TIMER_RING_COLOR + (255,), width=vm.px(vm.TIMER_RING_WIDTH))
+    font = vm.get_font(vm.px(vm.TIMER_FONT_SIZE), *vm.BOLD_FONT_FALLBACKS)
+    text = str(time_left)
+    bbox = draw.textbbox((0, 0), text, font=font)
+    draw.text((center_x - (bbox[2] - bbox[0]) // 2, center_y - (bbox[3] - bbox[1]) // 2), text, font=font,
+              fill=vm.timer_color(time_left))
+    return vm.crop_to_sprite(np.array(img))
+
+
+def quiz_layers(full_frame):
+    question = vm.create_text_with_shadow("Who directed Inception?\n\nA. Steven Spielberg\nB. Christopher Nolan\n"
+                                          "C. James Cameron\nD. Quentin Tarantino", 'Arial', 'white', vm.FONT_SIZE - 5)
+    timer = circular_timer(7)
+    layers = [ColorClip(vm.RESOLUTION, color=(30, 40, 60)).set_duration(1)]
+    for sprite in (question, timer):
+        if full_frame:
+            layers.append(ImageClip(sprite_to_frame(sprite)).set_duration(1))
+        else:
+            layers.append(vm.sprite_clip(sprite).set_duration(1))
+    overlay_bytes = sum(clip.get_frame(0).nbytes + clip.mask.get_frame(0).nbytes for clip in layers[1:])
+    return CompositeVideoClip(layers, size=vm.RESOLUTION), overlay_bytes
+
+
+def bench(full_frame, frames):
+    clip, overlay_bytes = quiz_layers(full_frame)
+    clip.get_frame(0)  # warm-up
+    start = time.perf_counter()
+    for i in range(frames):
+        clip.get_frame(i / frames)
+    elapsed = time.perf_counter() - start
+    return elapsed / frames * 1000, overlay_bytes
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    vm.overlay_cache.cache_dir = None
+    full_ms, full_bytes = bench(True, frames)
+    sprite_ms, sprite_bytes = bench(False, frames)
+    print(f"full-frame overlays: {full_ms:7.1f} ms/frame, {full_bytes / 1e6:6.1f} MB overlay data")
+    print(f"sprite overlays:     {sprite_ms:7.1f} ms/frame, {sprite_bytes / 1e6:6.1f} MB overlay data")
+    print(f"speed-up: {full_ms / sprite_ms:.2f}x")
@@ -0,0 +1,106 @@
+"""Encode a reference template with every encoding profile and report encode speed and output size.
+
+Usage:
+    python benchmarks/bench_profiles.py [--template quiz] [--profiles draft,publish,archive]
+                                        [--repeat N] [--output profiles.json]
+
+The template is rendered once from synthetic inputs (see bench_templates.py) into a lossless
+intermediate, which is then encoded with each profile's x264 and AAC settings exactly as
+video_maker.py passes them. Compositing is thus left out and the timings measure the encoder alone:
+encode fps is frames per wall-clock second of that ffmpeg run.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_templates import TEMPLATES, fastest, git_revision, isolate_caches, make_assets, synthetic_job  # noqa: E402
+
+LOSSLESS = {'profile': 'draft', 'crf': 0}  # x264 at crf 0 is lossless, and ultrafast keeps decoding it cheap
+
+
+def render_reference(vm, template, assets, work_dir):
+    """Render ``template`` to a lossless file and return (path, frame count)."""
+    isolate_caches(vm, work_dir)
+    data = dict(synthetic_job(template, assets, os.path.join(work_dir, 'reference.mp4')), encoding=LOSSLESS)
+    _, _, error = vm.render_job(1, data)
+    if error:
+        raise RuntimeError(f"{template} failed: {error}")
+    timeline = vm.TIMELINE_BUILDERS[template](data)
+    frames = int(round(timeline.duration * vm.FPS))
+    timeline.close()
+    return data['output'], frames
+
+
+def encode(vm, reference, profile, output):
+    """Encode the reference with ``profile``; returns (wall seconds, output bytes)."""
+    from moviepy.config import get_setting
+    settings = vm.encoding_settings({'encoding': profile})
+    cmd = [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error', '-i', reference,
+           '-vcodec', 'libx264'] + vm.encoder_params(settings) + ['-pix_fmt', 'yuv420p',
+           '-acodec', 'aac', '-b:a', settings['audio_bitrate'], output]
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    return time.perf_counter() - start, os.path.getsize(output)
+
+
+def run(template, profiles, repeat, output):
+    import video_maker as vm
+    work_root = tempfile.mkdtemp(prefix='bench-profiles-')
+    try:
+        assets = make_assets(os.path.join(work_root, 'assets'))
+        reference, frames = render_reference(vm, template, assets, work_root)
+        duration = frames / vm.FPS
+        results = []
+        for profile in profiles:
+            settings = vm.encoding_settings({'encoding': profile})
+            path = os.path.join(work_root, f"{profile}.mp4")
+            wall, size = fastest(encode(vm, reference, profile, path) for _ in range(repeat))
+            results.append({
+                'profile': profile,
+                'preset': settings['preset'],
+                'crf': settings['crf'],
+                'gop_seconds': settings['gop_seconds'],
+                'threads': settings['threads'] or vm.ENCODER_THREADS,
+                'audio_bitrate': settings['audio_bitrate'],
+                'frames': frames,
+                'encode_s': round(wall, 3),
+                'encode_fps': round(frames / wall, 2),
+                'output_bytes': size,
+                'kbps': round(size * 8 / duration / 1000, 1),
+            })
+            print(f"{profile:10s} {settings['preset']:10s} crf {settings['crf']:<3} {wall:8.2f}s "
+                  f"{frames / wall:7.1f} fps {size / 1e6:7.2f} MB {size * 8 / duration / 1000:8.0f} kbps")
+    finally:
+        shutil.rmtree(work_root, ignore_errors=True)
+
+    report = {
+        'meta': {'revision': git_revision(), 'python': platform.python_version(), 'platform': platform.platform(),
+                 'cpu_count': os.cpu_count(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'repeat': repeat,
+                 'template': template, 'size': list(vm.RESOLUTION), 'fps': vm.FPS},
+        'results': results,
+    }
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    import video_maker as vm
+    parser = argparse.ArgumentParser(description="Encoding profile benchmarks")
+    parser.add_argument('--template', choices=TEMPLATES, default='quiz')
+    parser.add_argument('--profiles', default=','.join(vm.ENCODING_PROFILES))
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', help="also write the measurements to this JSON file")
+    args = parser.parse_args()
+    run(args.template, args.profiles.split(','), args.repeat, args.output)
@@ -0,0 +1,267 @@
+"""Render every video template on synthetic inputs and record wall time, frames/sec, peak RSS and output size.
+
+Usage:
+    python benchmarks/bench_templates.py run [--output results.json] [--templates quiz,fact]
+                                             [--resolutions full,preview] [--repeat N]
+    python benchmarks/bench_templates.py compare baseline.json results.json [--tolerance 0.10]
+
+All inputs (solid and noise images, a noise video loop, a silent audio track) are generated with fixed
+seeds, so the suite runs offline. Each case renders in a fresh process with empty caches, so results do
+not depend on what ran before. ``compare`` exits with status 1 when a case got slower, bigger or
+hungrier than the baseline by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TEMPLATES = ['quiz', 'fact', 'emoji_guess', 'character_reveal', 'minimalist_challenge', 'then_now', 'opinion']
+RESOLUTIONS = ['full', 'preview']  # 'preview' renders as video_maker.py --preview does
+METRICS = ['wall_s', 'peak_rss_mb', 'output_bytes']  # lower is better for all of them
+AUDIO_SECONDS = 60
+
+
+def write_image(path, size, seed=None, color=None):
+    if color is not None:
+        Image.new('RGB', size, color).save(path)
+    else:
+        rng = np.random.default_rng(seed)
+        Image.fromarray(rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)).save(path, quality=90)
+    return path
+
+
+def write_silence(path, seconds=AUDIO_SECONDS, rate=44100):
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(bytes(seconds * rate * 4))
+    return path
+
+
+def write_noise_loop(path, size=(270, 480), seconds=2, fps=30, seed=0):
+    """Short looping video of smooth, drifting value noise (pure per-pixel noise would mostly benchmark x264)."""
+    from moviepy.editor import VideoClip
+    rng = np.random.default_rng(seed)
+    cells = rng.integers(0, 256, (size[1] // 16, size[0] // 16, 3), dtype=np.uint8)
+    frames = [np.asarray(Image.fromarray(np.roll(cells, i // 4, axis=1)).resize(size, Image.BILINEAR))
+              for i in range(seconds * fps)]
+    VideoClip(lambda t: frames[min(int(t * fps), len(frames) - 1)], duration=seconds).write_videofile(
+        path, fps=fps, codec='libx264', audio=False, logger=None)
+    return path
+
+
+def make_assets(asset_dir):
+    """Generate the synthetic media shared by all cases."""
+    os.makedirs(asset_dir, exist_ok=True)
+    path = lambda name: os.path.join(asset_dir, name)
+    assets = {
+        'solid': write_image(path('solid.png'), (1080, 1920), color=(30, 40, 60)),
+        'noise': write_image(path('noise.png'), (1080, 1920), seed=1),
+        'loop': write_noise_loop(path('loop.mp4')),
+        'poster': write_image(path('poster.jpg'), (800, 1200), seed=2),
+        'character': write_image(path('character.jpg'), (900, 1200), seed=3),
+        'icon': write_image(path('icon.jpg'), (800, 1200), color=(220, 200, 40)),
+        'then': write_image(path('then.jpg'), (800, 1000), seed=4),
+        'now': write_image(path('now.jpg'), (800, 1000), seed=5),
+        'logo': write_image(path('logo.png'), (300, 120), color=(200, 30, 30)),
+        'audio': write_silence(path('silence.wav')),
+    }
+    with open(path('assets.json'), 'w', encoding='utf-8') as f:
+        json.dump(assets, f)
+    return assets
+
+
+def synthetic_job(template, assets, output):
+    """Input entry for ``template`` built only from generated assets."""
+    common = {'type': template, 'output': output, 'logo': assets['logo'], 'audio': assets['audio'],
+              'background': assets['solid']}
+    jobs = {
+        'quiz': {'question': "Which film won Best Picture in 1998?",
+                 'options': ["A. Titanic", "B. Good Will Hunting", "C. L.A. Confidential", "D. As Good as It Gets"],
+                 'correct_answer': "A. Titanic", 'timer': 5, 'background': assets['loop']},
+        'fact': {'fact': "The sound of the velociraptors in Jurassic Park was made by mating tortoises.",
+                 'poster': assets['poster'], 'background': assets['noise']},
+        'emoji_guess': {'emojis': ["\U0001F988", "\U0001F30A", "\U0001F6A4"], 'movie_title': "Jaws",
+                        'fun_fact': "The shark was nicknamed Bruce.", 'poster': assets['poster']},
+        'character_reveal': {'character_image': assets['character'], 'hint': "He wears a cape",
+                             'character_name': "Batman", 'movie_title': "The Dark Knight"},
+        'minimalist_challenge': {'minimalist_icon': assets['icon'], 'movie_poster': assets['poster']},
+        'then_now': {'comparisons': [{'name': f"Actor {i}", 'then_year': 2001, 'now_year': 2024,
+                                      'then_image': assets['then'], 'now_image': assets['now']} for i in range(2)]},
+        'opinion': {'opinions': [f"Sequel number {i} was better than the original" for i in range(4)]},
+    }
+    return {**common, **jobs[template]}
+
+
+def peak_rss_mb(who):
+    """Peak resident set size of this process or its children, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(who(resource)).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def isolate_caches(vm, work_dir):
+    """Point all of video_maker's on-disk caches into ``work_dir``, so a run neither reuses nor fills the repo's .cache."""
+    vm.overlay_cache.cache_dir = os.path.join(work_dir, 'overlays')
+    vm.BACKGROUND_CACHE_DIR = os.path.join(work_dir, 'backgrounds')
+    vm.SEGMENT_CACHE_DIR = os.path.join(work_dir, 'segments')
+    vm.AUDIO_CACHE_DIR = os.path.join(work_dir, 'audio')
+    vm.PROBE_CACHE_PATH = os.path.join(work_dir, 'probes.json')
+
+
+def fastest(runs, key=None):
+    """The best of repeated runs; the slower ones mostly measure noise from the rest of the machine."""
+    return min(runs, key=key)
+
+
+def run_case(template, resolution_name, asset_dir, work_dir):
+    """Render one template in this process with empty caches and return its measurements."""
+    import video_maker as vm
+    if resolution_name == 'preview':
+        vm.use_preview()
+    isolate_caches(vm, work_dir)
+
+    with open(os.path.join(asset_dir, 'assets.json'), 'r', encoding='utf-8') as f:
+        assets = json.load(f)
+    output = os.path.join(work_dir, f"{template}.mp4")
+    data = synthetic_job(template, assets, output)
+
+    start = time.perf_counter()
+    _, _, error = vm.render_job(1, data)
+    wall = time.perf_counter() - start
+    if error:
+        raise RuntimeError(f"{template} failed: {error}")
+    timeline = vm.TIMELINE_BUILDERS[template](data)
+    frames = int(round(timeline.duration * vm.FPS))
+    timeline.close()
+    return {
+        'template': template,
+        'resolution': resolution_name,
+        'size': list(vm.RESOLUTION),
+        'fps': vm.FPS,
+        'profile': vm.ENCODING_PROFILE,
+        'frames': frames,
+        'wall_s': round(wall, 3),
+        'frames_per_s': round(frames / wall, 2),
+        'peak_rss_mb': peak_rss_mb(lambda resource: resource.RUSAGE_SELF),
+        'encoder_peak_rss_mb': peak_rss_mb(lambda resource: resource.RUSAGE_CHILDREN),
+        'output_bytes': os.path.getsize(output),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(templates, resolutions, repeat, output):
+    work_root = tempfile.mkdtemp(prefix='bench-templates-')
+    try:
+        asset_dir = os.path.join(work_root, 'assets')
+        make_assets(asset_dir)
+        results = []
+        for resolution_name in resolutions:
+            for template in templates:
+                runs = []
+                for i in range(repeat):
+                    work_dir = os.path.join(work_root, f"{template}-{resolution_name}-{i}")
+                    os.makedirs(work_dir)
+                    proc = subprocess.run([sys.executable, os.path.abspath(__file__), 'case', template, resolution_name,
+                                           asset_dir, work_dir], check=True, stdout=subprocess.PIPE, text=True)
+                    runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+                    shutil.rmtree(work_dir, ignore_errors=True)
+                best = fastest(runs, key=lambda run: run['wall_s'])
+                best['runs_wall_s'] = [run['wall_s'] for run in runs]
+                results.append(best)
+                print(f"{template:22s} {resolution_name:8s} {best['wall_s']:8.2f}s {best['frames_per_s']:7.1f} fps "
+                      f"{best['peak_rss_mb'] or 0:8.0f} MB {best['output_bytes'] / 1e6:7.2f} MB out")
+    finally:
+        shutil.rmtree(work_root, ignore_errors=True)
+
+    report = {
+        'meta': {'revision': git_revision(), 'python': platform.python_version(), 'platform': platform.platform(),
+                 'cpu_count': os.cpu_count(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'repeat': repeat},
+        'results': results,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return report
+
+
+def compare(baseline_path, results_path, tolerance):
+    """Print per-case changes against the baseline; returns the list of regressions."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['template'], r['resolution']): r for r in json.load(f)['results']}
+    with open(results_path, 'r', encoding='utf-8') as f:
+        results = json.load(f)['results']
+
+    regressions = []
+    for result in results:
+        base = baseline.get((result['template'], result['resolution']))
+        if base is None:
+            print(f"{result['template']:22s} {result['resolution']:8s} (not in baseline)")
+            continue
+        changes = []
+        for metric in METRICS:
+            if not base.get(metric) or result.get(metric) is None:
+                continue
+            change = result[metric] / base[metric] - 1
+            flag = ''
+            if change > tolerance:
+                flag = ' REGRESSION'
+                regressions.append((result['template'], result['resolution'], metric, change))
+            changes.append(f"{metric} {change:+.1%}{flag}")
+        print(f"{result['template']:22s} {result['resolution']:8s} " + ', '.join(changes))
+    print(f"\n{len(regressions)} regressions (tolerance {tolerance:.0%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Template rendering benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help="render every template and write the measurements to JSON")
+    run.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results.json'))
+    run.add_argument('--templates', default=','.join(TEMPLATES))
+    run.add_argument('--resolutions', default=','.join(RESOLUTIONS))
+    run.add_argument('--repeat', type=int, default=1)
+    cmp = commands.add_parser('compare', help="flag regressions of a results file against a baseline")
+    cmp.add_argument('baseline')
+    cmp.add_argument('results')
+    cmp.add_argument('--tolerance', type=float, default=0.10)
+    case = commands.add_parser('case', help=argparse.SUPPRESS)
+    case.add_argument('template', choices=TEMPLATES)
+    case.add_argument('resolution', choices=RESOLUTIONS)
+    case.add_argument('asset_dir')
+    case.add_argument('work_dir')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run_suite(args.templates.split(','), args.resolutions.split(','), args.repeat, args.output)
+    elif args.command == 'compare':
+        if compare(args.baseline, args.results, args.tolerance):
+            raise SystemExit(1)
+    else:
+        result = run_case(args.template, args.resolution, args.asset_dir, args.work_dir)
+        sys.stdout.flush()
+        print(json.dumps(result))
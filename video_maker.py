@@ -1,17 +1,91 @@
-from moviepy.editor import VideoFileClip, ImageClip, CompositeVideoClip, concatenate_videoclips, AudioFileClip
 import json
 import os
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
-import numpy as np
-import tkinter as tk
-from tkinter import filedialog, messagebox
+import re
+import importlib
 import textwrap
+import bisect
+import subprocess
+import shutil
+import tempfile
+import functools
+import hashlib
+import inspect
+import difflib
+import contextlib
+import itertools
+import threading
+import queue
+import time
+from collections import OrderedDict, namedtuple, deque, Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+class LazyImport:
+    """A module, or a class/function of a module, imported on first use.
+    
+    numpy, PIL and moviepy take most of a second to import, so they are only loaded once something
+    renders; validating or planning a batch never touches them. Class proxies work with isinstance().
+    """
+    
+    def __init__(self, module, attribute=None):
+        self._module = module
+        self._attribute = attribute
+        self._target = None
+    
+    def _load(self):
+        if self._target is None:
+            target = importlib.import_module(self._module)
+            self._target = getattr(target, self._attribute) if self._attribute else target
+        return self._target
+    
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+    
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+    
+    def __instancecheck__(self, instance):
+        return isinstance(instance, self._load())
+
+np = LazyImport('numpy')
+Image = LazyImport('PIL.Image')
+ImageDraw = LazyImport('PIL.ImageDraw')
+ImageFont = LazyImport('PIL.ImageFont')
+ImageFilter = LazyImport('PIL.ImageFilter')
+# moviepy submodules directly: moviepy.editor also imports IPython, requests, pygame hooks, ...
+VideoClip = LazyImport('moviepy.video.VideoClip', 'VideoClip')
+ImageClip = LazyImport('moviepy.video.VideoClip', 'ImageClip')
+VideoFileClip = LazyImport('moviepy.video.io.VideoFileClip', 'VideoFileClip')
+CompositeAudioClip = LazyImport('moviepy.audio.AudioClip', 'CompositeAudioClip')
+AudioArrayClip = LazyImport('moviepy.audio.AudioClip', 'AudioArrayClip')
+resize = LazyImport('moviepy.video.fx.resize', 'resize')
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_binary():
+    """The ffmpeg moviepy uses, found the way moviepy.config does but without importing it (it loads imageio and numpy)."""
+    binary = os.getenv('FFMPEG_BINARY', 'ffmpeg-imageio')
+    if binary == 'ffmpeg-imageio':
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    if binary == 'auto-detect':
+        return shutil.which('ffmpeg') or shutil.which('ffmpeg.exe') or 'unset'
+    return binary
 
 # Configuration
 RESOLUTION = (1080, 1920)  # 9:16 for YouTube Shorts
 FPS = 30
+DESIGN_RESOLUTION = (1080, 1920)  # all sizes and positions below are in pixels of this frame, scaled to RESOLUTION
+PREVIEW_RESOLUTION = (540, 960)  # --preview: quick review renders with the same layout
+PREVIEW_FPS = 15
+PREVIEW_PROFILE = 'draft'
+PREVIEW_SUFFIX = '.preview'  # previews are written next to the final output as <name>.preview.mp4
+OUTPUT_SUFFIX = ''
 FONT_SIZE = 50
 TIMER_FONT_SIZE = 120
+TIMER_CENTER_Y = 200
+TIMER_RADIUS = 80
+TIMER_RING_WIDTH = 8
+TIMER_RING_COLOR = (57, 255, 20)
 OUTRO_TEXT_QUIZ = "Subscribe for more quizzes!"
 OUTRO_TEXT_FACT = "Subscribe for more fun facts!"
 OUTRO_TEXT_EMOJI = "Subscribe for more emoji challenges!"
@@ -21,51 +95,716 @@ OUTRO_TEXT_THEN_NOW = "Subscribe for more comparisons!"
 OUTRO_TEXT_OPINION = "Subscribe for more hot takes!"
 INTRO_DURATION = 2
 OUTRO_DURATION = 3
+SHAKE_STYLES = ('steps', 'smooth')  # per job: "shake"
+SHAKE_OFFSETS = [(5, 3), (-3, -5), (4, 2), (-2, -3), (0, 0), (3, -2), (-4, 4), (2, -1)]
+RENDERER_VERSION = 2  # bump when template output changes so the build manifest re-renders everything
+BUILD_MANIFEST_NAME = '.build_manifest.json'
+ASSET_KEYS = ('background', 'audio', 'logo', 'poster', 'character_image', 'minimalist_icon', 'movie_poster',
+              'then_image', 'now_image')
+FONT_CACHE_SIZE = 64
+STILL_IMAGE_TUNE_THRESHOLD = 0.75  # share of static timeline above which x264 is tuned for still images
+OVERLAY_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'overlays')
+OVERLAY_CACHE_MEMORY_BYTES = 512 * 1024 * 1024
+OVERLAY_CACHE_DISK_BYTES = 2 * 1024 * 1024 * 1024
+OVERLAY_CACHE_VERSION = 2  # bump when the drawing code changes so stale rasters are not reused
+BLUR_PYRAMID_DETAIL = 8  # blur is computed at 1/(radius // 8) scale, capped below
+BLUR_PYRAMID_MAX_SCALE = 4
+BACKGROUND_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'backgrounds')
+BACKGROUND_MMAP_MAX_BYTES = 256 * 1024 * 1024  # loops whose decoded frames fit (about 1.4 s at 1080x1920, 30 fps) are kept as raw .npy frames
+BACKGROUND_CACHE_DISK_BYTES = 4 * 1024 * 1024 * 1024
+BACKGROUND_CACHE_VERSION = 1
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.gif')
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.aac', '.ogg', '.flac')
+PROBE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'probes.json')
+PROBE_WORKERS = 8  # threads probing asset headers before a batch starts (mostly waiting on ffmpeg)
+PREFLIGHT_BATCH = 256  # entries read and preflighted together while streaming an input file
+CHECKPOINT_SUFFIX = '.checkpoint.jsonl'  # next to the input file; lists the videos finished by the last run
+IMAGE_CACHE_BYTES = 256 * 1024 * 1024  # decoded, resized pictures (logos, posters, backgrounds) shared by all jobs in a process
+SEGMENT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'segments')
+SEGMENT_CACHE_DISK_BYTES = 10 * 1024 * 1024 * 1024
+SEGMENT_CACHE_VERSION = 1
+SEGMENT_CACHE_ENABLED = True  # per job: "segment_cache": false, or "refresh" to re-encode cached segments (--force)
+AUDIO_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'audio')
+AUDIO_CACHE_DISK_BYTES = 512 * 1024 * 1024
+AUDIO_CACHE_VERSION = 1
+AUDIO_FPS = 44100
+PCM_CACHE_BYTES = 256 * 1024 * 1024  # decoded music tracks (about 21 MB per stereo minute) kept per process
+AUDIO_BITRATE = '192k'  # intermediate audio (background proxies); final tracks use the encoding profile's bitrate
+# x264 preset, constant rate factor, keyframe interval, encoder threads (None: ENCODER_THREADS) and AAC bitrate
+ENCODING_PROFILES = {
+    'draft': {'preset': 'ultrafast', 'crf': 28, 'gop_seconds': 2, 'threads': None, 'audio_bitrate': '96k'},
+    'publish': {'preset': 'medium', 'crf': 23, 'gop_seconds': 8, 'threads': None, 'audio_bitrate': '192k'},
+    'archive': {'preset': 'slow', 'crf': 18, 'gop_seconds': 10, 'threads': None, 'audio_bitrate': '320k'},
+}
+ENCODING_PROFILE = 'publish'  # batch default (CLI: --profile, input: "defaults"); per job: "encoding"
+ENCODER_THREADS = os.cpu_count() or 1
+X264_PRESETS = ('ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow', 'placebo')
+AUDIO_SEAM_FADE = 0.0  # seconds of fade out/in around each loop point (per job: "audio_seam_fade")
+AUDIO_END_FADE = 0.0  # seconds of fade-out at the end of the video (per job: "audio_fade")
+RENDER_WORKERS = min(4, os.cpu_count() or 1)  # compositor threads producing frames ahead of the encoder (per job: "render_workers")
+RENDER_QUEUE_FRAMES = 16  # composited frames buffered between the compositors and ffmpeg
+ENCODER_PIPE_BUFFER = 16 * 1024 * 1024
+CHUNK_JOBS = 1  # processes sharing the segments of a single video (per job: "chunk_jobs", CLI: --chunk-jobs)
+TRACE_SAMPLE_EVERY = 30  # with --trace, one frame in this many records its compositing and pipe-write spans
+DAEMON_HOST = '127.0.0.1'  # --serve only listens locally by default
+DAEMON_PORT = 8765
+DAEMON_JOB_HISTORY = 1000  # finished jobs the daemon keeps for status queries
+DAEMON_LATENCY_WINDOW = 200  # most recent finished jobs used for the latency percentiles
+
+# Directories searched (in order) when a font is given by name rather than path
+FONT_DIRS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'inputs'),
+    "C:\\Windows\\Fonts",
+    os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+    "/usr/local/share/fonts",
+    "/usr/share/fonts",
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+]
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc')
+# Windows font names used by the templates, followed by their common Linux/macOS equivalents
+BOLD_FONT_FALLBACKS = ['arialbd', 'calibrib', 'Arial Bold', 'LiberationSans-Bold', 'DejaVuSans-Bold']
+REGULAR_FONT_FALLBACKS = ['arial', 'Arial', 'LiberationSans-Regular', 'DejaVuSans']
+
+# Profiling
+class Tracer:
+    """Collects stage timings as Chrome trace events ("X" spans, "C" counters) while enabled.
+    
+    Worker processes append their events to ``<path>.<pid>.part`` files, which the main process
+    merges into ``path`` when it saves the trace.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.part_path = None
+        self.context = {}  # job id, template type, ... added to the args of every span
+        self.events = []
+        self._threads = set()
+        self._lock = threading.Lock()
+    
+    def start(self, path, worker=False):
+        self.enabled = True
+        self.path = path
+        self.part_path = f"{path}.{os.getpid()}.part" if worker else None
+        if worker:
+            # A forked worker inherits the parent's unflushed events; those are the parent's to report
+            self.events = []
+            self._threads = set()
+    
+    @contextlib.contextmanager
+    def span(self, name, category='render', **args):
+        if not self.enabled:
+            yield
+            return
+        timestamp = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add({'name': name, 'cat': category, 'ph': 'X', 'ts': timestamp * 1e6,
+                       'dur': (time.perf_counter() - start) * 1e6, 'args': {**self.context, **args}})
+    
+    def traced(self, name=None, category='render'):
+        """Decorator recording a span around every call of the function."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name or func.__name__, category):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+    
+    def counter(self, name, **values):
+        if self.enabled:
+            self._add({'name': name, 'ph': 'C', 'ts': time.time() * 1e6, 'args': values})
+    
+    def _add(self, event):
+        thread = threading.current_thread()
+        event['pid'], event['tid'] = os.getpid(), thread.ident
+        with self._lock:
+            if (event['pid'], event['tid']) not in self._threads:
+                self._threads.add((event['pid'], event['tid']))
+                self.events.append({'name': 'thread_name', 'ph': 'M', 'pid': event['pid'], 'tid': event['tid'],
+                                    'args': {'name': thread.name}})
+            self.events.append(event)
+    
+    def flush(self):
+        """Hand a worker's events over to the main process (no-op outside workers)."""
+        if not self.part_path:
+            return
+        with self._lock:
+            events, self.events = self.events, []
+        with open(self.part_path, 'a', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(event) + '\n')
+    
+    def save(self):
+        """Write this process's and all flushed worker events to ``path`` as a Chrome trace."""
+        events = list(self.events)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        prefix = os.path.basename(self.path) + '.'
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and name.endswith('.part'):
+                part_path = os.path.join(directory, name)
+                with open(part_path, 'r', encoding='utf-8') as f:
+                    events.extend(json.loads(line) for line in f if line.strip())
+                os.remove(part_path)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+tracer = Tracer()
+
+def start_worker(path, output_format):
+    """Process pool initializer: render in the parent's output format, and trace the worker into a part
+    file when the parent is tracing. Spawned workers (Windows, macOS) re-import this module with the defaults.
+    """
+    set_output_format(output_format)
+    if path:
+        tracer.start(path, worker=True)
+
+# Font registry
+_font_index = None
+
+def build_font_index():
+    """Scan FONT_DIRS once and map lower-cased font file names (without extension) to paths."""
+    global _font_index
+    if _font_index is None:
+        index = {}
+        for font_dir in FONT_DIRS:
+            if not os.path.isdir(font_dir):
+                continue
+            for root, _, files in os.walk(font_dir):
+                for name in files:
+                    stem, ext = os.path.splitext(name)
+                    if ext.lower() in FONT_EXTENSIONS:
+                        index.setdefault(stem.lower(), os.path.join(root, name))
+        _font_index = index
+    return _font_index
+
+@functools.lru_cache(maxsize=None)
+def resolve_font(font_name):
+    """Resolve a font path or name (e.g. 'inputs/BebasNeue-Regular.ttf' or 'Arial') to a file path, or None."""
+    if not font_name:
+        return None
+    if os.path.isfile(font_name):
+        return font_name
+    stem = os.path.splitext(os.path.basename(font_name))[0] if font_name.lower().endswith(FONT_EXTENSIONS) else font_name
+    return build_font_index().get(stem.lower())
+
+@functools.lru_cache(maxsize=FONT_CACHE_SIZE)
+def _load_font(path, size):
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return None
+
+def get_font(size, *font_names):
+    """Return a cached FreeTypeFont for the first resolvable name, falling back to PIL's default font."""
+    for font_name in font_names:
+        path = resolve_font(font_name)
+        if path:
+            font = _load_font(path, size)
+            if font is not None:
+                return font
+    return ImageFont.load_default()
+
+# Overlay raster cache
+def cache_dir_entries(cache_dir, extension):
+    """(mtime, size, path) of every cached file with ``extension`` under ``cache_dir``."""
+    entries = []
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            if name.endswith(extension) and '.tmp' not in name:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+    return entries
+
+def trim_cache_dir(cache_dir, max_bytes, extension):
+    """Evict least recently used files until the directory is comfortably under ``max_bytes``; returns the new total."""
+    entries = sorted(cache_dir_entries(cache_dir, extension))
+    total = sum(size for _, size, _ in entries)
+    if total <= max_bytes:
+        return total
+    target = max_bytes * 0.9
+    for _, size, path in entries:
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+    return total
+
+Sprite = namedtuple('Sprite', ['image', 'position'])  # tight RGBA crop + (x, y) of its top-left corner in the frame
+
+class OverlayCache:
+    """Two-tier (memory LRU + compressed .npz on disk) cache of rendered overlay sprites."""
+    
+    def __init__(self, cache_dir=OVERLAY_CACHE_DIR, max_memory_bytes=OVERLAY_CACHE_MEMORY_BYTES,
+                 max_disk_bytes=OVERLAY_CACHE_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npz")
+    
+    def get(self, key):
+        sprite = self._memory.get(key)
+        if sprite is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return sprite
+        if self.cache_dir:
+            path = self._path(key)
+            try:
+                with np.load(path) as stored:
+                    sprite = Sprite(stored['overlay'], tuple(int(v) for v in stored['position']))
+                os.utime(path)  # keep mtime as last-use time for disk eviction
+            except (OSError, KeyError, ValueError):
+                sprite = None
+            if sprite is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                return self._remember(key, sprite)
+        self.misses += 1
+        return None
+    
+    def put(self, key, sprite):
+        sprite = self._remember(key, sprite)
+        if self.cache_dir:
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(tmp_path, 'wb') as f:
+                    np.savez_compressed(f, overlay=sprite.image, position=np.array(sprite.position))
+                os.replace(tmp_path, path)
+                self._track_disk(os.path.getsize(path))
+            except OSError as e:
+                print(f"Warning: Could not write overlay cache - {e}")
+        return sprite
+    
+    def _remember(self, key, sprite):
+        sprite.image.flags.writeable = False  # shared between callers, must not be drawn on
+        if sprite.image.nbytes > self.max_memory_bytes:
+            return sprite
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key).image.nbytes
+        self._memory[key] = sprite
+        self._memory_bytes += sprite.image.nbytes
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.image.nbytes
+        return sprite
+    
+    def _track_disk(self, added_bytes):
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in cache_dir_entries(self.cache_dir, '.npz'))
+        else:
+            self._disk_bytes += added_bytes
+        if self._disk_bytes > self.max_disk_bytes:
+            self._disk_bytes = trim_cache_dir(self.cache_dir, self.max_disk_bytes, '.npz')
+    
+    def clear_memory(self):
+        self._memory.clear()
+        self._memory_bytes = 0
+    
+    def stats(self):
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'memory_entries': len(self._memory), 'memory_bytes': self._memory_bytes,
+                'disk_bytes': self._disk_bytes}
+
+overlay_cache = OverlayCache()
+
+def cached_overlay(func):
+    """Memoise an overlay rasteriser in overlay_cache, keyed on its name, bound arguments and fonts."""
+    signature = inspect.signature(func)
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        if 'resolution' in arguments:
+            arguments['resolution'] = tuple(arguments['resolution'] or RESOLUTION)
+        # Include the resolved font file so installing a font invalidates the fallback rendering
+        if 'font_name' in arguments:
+            arguments['font_path'] = resolve_font(arguments['font_name'])
+        raw_key = repr((OVERLAY_CACHE_VERSION, func.__name__, sorted(arguments.items())))
+        key = hashlib.sha1(raw_key.encode('utf-8')).hexdigest()
+        sprite = overlay_cache.get(key)
+        if sprite is None:
+            with tracer.span(func.__name__, 'rasterise'):
+                sprite = overlay_cache.put(key, func(*args, **kwargs))
+        return sprite
+    
+    wrapper.uncached = func
+    return wrapper
 
 # Utility functions (load_background, create_text_with_shadow, etc.) remain unchanged
-def load_background(media_path, duration):
-    """Load and prepare background video or image (GIF, MP4, or Image)."""
-    if media_path.endswith(('.mp4', '.mov', '.avi')):
-        clip = VideoFileClip(media_path).resize(RESOLUTION)
-        if clip.duration < duration:
-            num_loops = int(duration / clip.duration) + 1
-            clip = concatenate_videoclips([clip] * num_loops).subclip(0, duration)
+def layout_scale(resolution=None):
+    return (resolution or RESOLUTION)[1] / DESIGN_RESOLUTION[1]
+
+def px(value, resolution=None):
+    """A length laid out in DESIGN_RESOLUTION pixels, in pixels of ``resolution`` (default RESOLUTION)."""
+    return int(round(value * layout_scale(resolution)))
+
+def crop_to_sprite(img):
+    """Crop a full-frame RGBA array to the bounding box of its visible pixels."""
+    alpha = img[:, :, 3]
+    rows = np.flatnonzero(alpha.any(axis=1))
+    cols = np.flatnonzero(alpha.any(axis=0))
+    if len(rows) == 0:
+        return Sprite(img[:1, :1], (0, 0))
+    top, bottom = rows[0], rows[-1] + 1
+    left, right = cols[0], cols[-1] + 1
+    return Sprite(np.ascontiguousarray(img[top:bottom, left:right]), (int(left), int(top)))
+
+def sprite_clip(sprite):
+    """ImageClip of a sprite placed where it was drawn; chain set_position to move it elsewhere."""
+    return ImageClip(sprite.image).set_position(sprite.position)
+
+_digest_cache = {}
+
+def file_digest(path):
+    """SHA-1 of a file's contents, memoised per (path, size, mtime)."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key not in _digest_cache:
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        _digest_cache[key] = sha.hexdigest()
+    return _digest_cache[key]
+
+def array_digest(array):
+    """SHA-1 of an array's shape, dtype and pixels."""
+    array = np.ascontiguousarray(array)
+    sha = hashlib.sha1(repr((array.shape, array.dtype.str)).encode('utf-8'))
+    sha.update(array.data)
+    return sha.hexdigest()
+
+_probe_cache = {}
+_probe_cache_loaded = False
+_probe_cache_lock = threading.Lock()  # the daemon preflights submissions on several HTTP threads at once
+
+def load_probe_cache():
+    """Merge the on-disk probe results into the in-memory cache (once per process)."""
+    global _probe_cache_loaded
+    with _probe_cache_lock:
+        if _probe_cache_loaded:
+            return
+        _probe_cache_loaded = True
+        try:
+            with open(PROBE_CACHE_PATH, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for path, size, mtime_ns, info in entries:
+            _probe_cache.setdefault((path, size, mtime_ns), info)
+
+def save_probe_cache():
+    """Write the probe results for files that still exist, so the next run skips probing them."""
+    entries = []
+    for (path, size, mtime_ns), info in list(_probe_cache.items()):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if (st.st_size, st.st_mtime_ns) == (size, mtime_ns):
+            entries.append([path, size, mtime_ns, info])
+    try:
+        os.makedirs(os.path.dirname(PROBE_CACHE_PATH), exist_ok=True)
+        tmp_path = f"{PROBE_CACHE_PATH}.{os.getpid()}.tmp"
+        with _probe_cache_lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, PROBE_CACHE_PATH)
+    except OSError as e:
+        print(f"Warning: Could not save probe cache - {e}")
+
+def read_media_info(path):
+    """Read picture size, duration, fps and audio sample rate from a file's headers.
+    
+    Parses ``ffmpeg -i`` directly rather than through PIL or moviepy's reader, so preflight and --check
+    never load numpy, PIL or moviepy.
+    """
+    # Without an output file ffmpeg exits with an error after printing the input's streams
+    log = subprocess.run([ffmpeg_binary(), '-hide_banner', '-i', path], stdin=subprocess.DEVNULL,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE).stderr.decode('utf-8', errors='replace')
+    video = next((line for line in log.splitlines() if ' Video: ' in line and 'attached pic' not in line), None)
+    audio = next((line for line in log.splitlines() if ' Audio: ' in line), None)
+    if video is None and audio is None:
+        last = next((line for line in reversed(log.splitlines()) if line.strip()), '')
+        raise IOError(last if last.startswith('Error') else "no picture, video or audio stream")
+    size = re.search(r' (\d+)x(\d+)[,\s]', video) if video else None
+    size = [int(size.group(1)), int(size.group(2))] if size else None
+    if not path.lower().endswith(VIDEO_EXTENSIONS + AUDIO_EXTENSIONS):
+        if size is None:
+            # The decoder's complaint, e.g. "[mjpeg @ 0x...] No JPEG data found in image"
+            complaint = next((line for line in log.splitlines() if line.startswith('[')), '')
+            raise IOError(re.sub(r'^\[[^]]*\] ', '', complaint) or "no picture size")
+        return {'size': size, 'duration': None, 'fps': None, 'audio_fps': None}
+    duration = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', log)
+    fps = re.search(r'([\d.]+) fps', video) or re.search(r'([\d.]+) tbr', video) if video else None
+    audio_fps = re.search(r'(\d+) Hz', audio) if audio else None
+    return {
+        'size': size,
+        'duration': int(duration.group(1)) * 3600 + int(duration.group(2)) * 60 + float(duration.group(3)) if duration else None,
+        'fps': float(fps.group(1)) if fps else None,
+        'audio_fps': int(audio_fps.group(1)) if audio_fps else None,
+    }
+
+def probe_media(path):
+    """Media metadata of a file, memoised per (path, size, mtime) in memory and in PROBE_CACHE_PATH."""
+    load_probe_cache()
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key not in _probe_cache:
+        with tracer.span('probe', 'load', path=path):
+            _probe_cache[key] = read_media_info(path)
+    return _probe_cache[key]
+
+def decode_image(path, size=None, height=None):
+    """Decode a picture as an RGB(A) array of exactly ``size``, or ``height`` pixels tall keeping its aspect.
+    
+    JPEGs are decoded in draft mode, where libjpeg scales by 1/2, 1/4 or 1/8 while staying at least
+    as large as the target, so only the last step is a full-quality LANCZOS resize.
+    """
+    with Image.open(path) as img:
+        if size is None:
+            size = (int(img.width * height / img.height), height)
+        size = tuple(size)
+        img.draft('RGB', size)
+        img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info else 'RGB')
+        if img.size != size:
+            img = img.resize(size, Image.Resampling.LANCZOS)
+        return np.asarray(img)
+
+_image_cache = OrderedDict()
+_image_cache_stats = {'hits': 0, 'misses': 0, 'bytes': 0}
+
+def load_image(path, size=None, height=None):
+    """Decoded, resized picture memoised per (path, size, mtime, target) across all jobs in the process."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns, tuple(size) if size else None, height)
+    image = _image_cache.get(key)
+    if image is not None:
+        _image_cache.move_to_end(key)
+        _image_cache_stats['hits'] += 1
+        return image
+    _image_cache_stats['misses'] += 1
+    with tracer.span('decode image', 'load', path=path):
+        image = decode_image(path, size, height)
+    image.flags.writeable = False  # shared between jobs, must not be drawn on
+    if image.nbytes <= IMAGE_CACHE_BYTES:
+        _image_cache[key] = image
+        _image_cache_stats['bytes'] += image.nbytes
+        while _image_cache_stats['bytes'] > IMAGE_CACHE_BYTES:
+            _, evicted = _image_cache.popitem(last=False)
+            _image_cache_stats['bytes'] -= evicted.nbytes
+    return image
+
+def image_clip(path, size=None, height=None):
+    """ImageClip of a cached picture at the target size; an alpha channel becomes its mask, as with ImageClip(path)."""
+    return ImageClip(load_image(path, size, height))
+
+def loop_clip(clip, duration):
+    """Loop a clip (and its audio) by wrapping time instead of concatenating copies."""
+    source_duration = clip.duration
+    looped = clip.fl_time(lambda t: t % source_duration, apply_to=['mask', 'audio'], keep_duration=False)
+    return looped.set_duration(duration)
+
+def build_background_frames(media_path, resolution, fps, path):
+    """Decode one loop of a video at the target resolution/fps into a memory-mappable .npy file."""
+    source = VideoFileClip(media_path, audio=False)
+    try:
+        clip = source.fx(resize, resolution)
+        num_frames = max(1, int(round(source.duration * fps)))
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        frames = None
+        try:
+            frames = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8,
+                                               shape=(num_frames, resolution[1], resolution[0], 3))
+            for i in range(num_frames):
+                frames[i] = clip.get_frame(i / fps)
+            frames.flush()
+        except BaseException:
+            # trim_cache_dir skips temporaries, so a partial file would stay forever
+            frames = None  # unmap first, or Windows refuses to delete it
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        frames = None
+        os.replace(tmp_path, path)
+    finally:
+        source.close()
+
+def build_background_proxy(media_path, resolution, fps, path):
+    """Transcode a video once to an exact-resolution, exact-fps proxy (audio is copied through)."""
+    tmp_path = f"{path}.{os.getpid()}.tmp.mp4"
+    cmd = [ffmpeg_binary(), '-y', '-loglevel', 'error', '-i', media_path,
+           '-vf', f"scale={resolution[0]}:{resolution[1]}:flags=lanczos,fps={fps}",
+           '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '16', '-pix_fmt', 'yuv420p',
+           '-c:a', 'aac', '-b:a', '192k', tmp_path]
+    try:
+        subprocess.run(cmd, check=True)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+def load_video_background(media_path, duration, resolution=None, fps=None):
+    """Background video from the derived-asset cache, looped to ``duration``.
+    
+    Short loops are decoded once into a raw frame file and played back by memory-mapped index lookup;
+    longer sources are transcoded once to a proxy that needs no per-frame resize.
+    """
+    resolution = resolution or RESOLUTION
+    fps = fps or FPS
+    info = probe_media(media_path)
+    source_duration = info['duration']
+    has_audio = info['audio_fps'] is not None
+    key = hashlib.sha1(repr((BACKGROUND_CACHE_VERSION, file_digest(media_path), tuple(resolution), fps)).encode('utf-8')).hexdigest()
+    os.makedirs(BACKGROUND_CACHE_DIR, exist_ok=True)
+    
+    frame_bytes = resolution[0] * resolution[1] * 3
+    if source_duration * fps * frame_bytes <= BACKGROUND_MMAP_MAX_BYTES:
+        frames_path = os.path.join(BACKGROUND_CACHE_DIR, f"{key}.npy")
+        if os.path.exists(frames_path):
+            os.utime(frames_path)
         else:
-            clip = clip.subclip(0, duration)
-        return clip
-    elif media_path.endswith('.gif'):
-        clip = VideoFileClip(media_path).resize(RESOLUTION)
-        if clip.duration < duration:
-            num_loops = int(duration / clip.duration) + 1
-            clip = concatenate_videoclips([clip] * num_loops).subclip(0, duration)
+            build_background_frames(media_path, resolution, fps, frames_path)
+        frames = np.load(frames_path, mmap_mode='r')
+        num_frames = len(frames)
+        clip = VideoClip(lambda t: frames[int(t * fps + 1e-6) % num_frames], duration=duration)
+        if has_audio:
+            # Looped by index arithmetic over the shared decoded PCM rather than a second ffmpeg reader
+            clip = clip.set_audio(AudioArrayClip(build_audio_bed(media_path, duration), fps=AUDIO_FPS))
+    else:
+        proxy_path = os.path.join(BACKGROUND_CACHE_DIR, f"{key}.mp4")
+        if os.path.exists(proxy_path):
+            os.utime(proxy_path)
         else:
-            clip = clip.subclip(0, duration)
-        return clip
+            build_background_proxy(media_path, resolution, fps, proxy_path)
+        clip = VideoFileClip(proxy_path)
+        # The ffmpeg reader seeks statefully, so compositor threads take turns reading from it
+        reader_lock = threading.Lock()
+        
+        def locked_frame(get_frame, t):
+            with reader_lock:
+                return get_frame(t)
+        clip = clip.fl(locked_frame)
+        clip = loop_clip(clip, duration) if clip.duration < duration else clip.subclip(0, duration)
+    # Files in use survive eviction: the frames are already mapped and the proxy open
+    trim_cache_dir(BACKGROUND_CACHE_DIR, BACKGROUND_CACHE_DISK_BYTES, ('.npy', '.mp4'))
+    clip.cache_key = ('background', key)
+    return clip
+
+_pcm_cache = OrderedDict()
+_pcm_cache_bytes = 0
+
+def decode_audio(path, fps=AUDIO_FPS):
+    """Decode an audio file once per (path, mtime, sample rate) into a float32 (samples, 2) array.
+    
+    Kept in an LRU bounded by PCM_CACHE_BYTES, so long-lived daemon workers don't grow with every track.
+    """
+    global _pcm_cache_bytes
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns, fps)
+    pcm = _pcm_cache.get(key)
+    if pcm is not None:
+        _pcm_cache.move_to_end(key)
+        return pcm
+    cmd = [ffmpeg_binary(), '-loglevel', 'error', '-i', path, '-vn',
+           '-f', 's16le', '-acodec', 'pcm_s16le', '-ar', str(fps), '-ac', '2', '-']
+    raw = subprocess.run(cmd, check=True, stdout=subprocess.PIPE).stdout
+    pcm = np.frombuffer(raw, dtype=np.int16).reshape(-1, 2).astype(np.float32) / 32768
+    pcm.flags.writeable = False  # shared between jobs
+    if pcm.nbytes <= PCM_CACHE_BYTES:
+        _pcm_cache[key] = pcm
+        _pcm_cache_bytes += pcm.nbytes
+        while _pcm_cache_bytes > PCM_CACHE_BYTES:
+            _, evicted = _pcm_cache.popitem(last=False)
+            _pcm_cache_bytes -= evicted.nbytes
+    return pcm
+
+def build_audio_bed(path, duration, fps=AUDIO_FPS, seam_fade=AUDIO_SEAM_FADE, end_fade=AUDIO_END_FADE):
+    """Loop a decoded track by index arithmetic to exactly ``duration`` seconds, with optional fades."""
+    pcm = decode_audio(path, fps)
+    num_samples = int(round(duration * fps))
+    source_len = len(pcm)
+    if source_len == 0:
+        return np.zeros((num_samples, 2), dtype=np.float32)
+    index = np.arange(num_samples)
+    positions = index % source_len
+    gain = np.ones(num_samples, dtype=np.float32)
+    seam = int(seam_fade * fps)
+    if seam > 0 and num_samples > source_len:
+        fade_in = np.clip(positions / seam, 0, 1)
+        fade_out = np.clip((source_len - 1 - positions) / seam, 0, 1)
+        # Fade in after every seam except the start, fade out before every seam the video reaches
+        gain *= np.where(index >= source_len, fade_in, 1)
+        gain *= np.where(index - positions + source_len < num_samples, fade_out, 1)
+    tail = min(int(end_fade * fps), num_samples)
+    if tail > 0:
+        gain[-tail:] *= np.linspace(1, 0, tail, dtype=np.float32)
+    return pcm[positions] * gain[:, None]
+
+@tracer.traced(category='audio')
+def audio_bed_file(path, duration, seam_fade=AUDIO_SEAM_FADE, end_fade=AUDIO_END_FADE, bitrate=AUDIO_BITRATE):
+    """Encoded AAC track of the audio bed, cached per (source, duration, fades) so it can be muxed as-is."""
+    key = hashlib.sha1(repr((AUDIO_CACHE_VERSION, file_digest(path), round(duration, 3), AUDIO_FPS,
+                             seam_fade, end_fade, bitrate)).encode('utf-8')).hexdigest()
+    bed_path = os.path.join(AUDIO_CACHE_DIR, f"{key}.m4a")
+    if os.path.exists(bed_path):
+        os.utime(bed_path)
+        return bed_path
+    os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+    bed = build_audio_bed(path, duration, AUDIO_FPS, seam_fade, end_fade)
+    tmp_path = f"{bed_path[:-4]}.{os.getpid()}.tmp.m4a"
+    try:
+        AudioArrayClip(bed, fps=AUDIO_FPS).write_audiofile(tmp_path, fps=AUDIO_FPS, codec='aac',
+                                                           bitrate=bitrate, logger=None)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, bed_path)
+    trim_cache_dir(AUDIO_CACHE_DIR, AUDIO_CACHE_DISK_BYTES, '.m4a')
+    return bed_path
+
+@tracer.traced(category='load')
+def load_background(media_path, duration):
+    """Load and prepare background video or image (GIF, MP4, or Image)."""
+    if media_path.lower().endswith(VIDEO_EXTENSIONS):
+        return load_video_background(media_path, duration)
     else:  # Image
-        return ImageClip(media_path, duration=duration).resize(RESOLUTION)
+        return image_clip(media_path, size=RESOLUTION).set_duration(duration)
 
-def create_text_with_shadow(text, font_name, color, size, resolution=RESOLUTION, shadow=True, max_width=900, shake_offset=(0, 0)):
-    """Create text with semi-transparent shadow overlay for better readability."""
+@cached_overlay
+def create_text_with_shadow(text, font_name, color, size, resolution=None, shadow=True, max_width=900, shake_offset=(0, 0)):
+    """Create text with semi-transparent shadow overlay for better readability, as a Sprite."""
+    resolution = resolution or RESOLUTION
     img = Image.new('RGBA', resolution, (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
     
-    try:
-        font_paths = [
-            f"C:\\Windows\\Fonts\\{font_name}.ttf",
-            f"C:\\Windows\\Fonts\\{font_name.lower()}.ttf",
-            "C:\\Windows\\Fonts\\arialbd.ttf",
-            "C:\\Windows\\Fonts\\calibrib.ttf",
-            "C:\\Windows\\Fonts\\arial.ttf"
-        ]
-        font_obj = None
-        for path in font_paths:
-            if os.path.exists(path):
-                font_obj = ImageFont.truetype(path, size)
-                break
-        if font_obj is None:
-            font_obj = ImageFont.load_default()
-    except:
-        font_obj = ImageFont.load_default()
+    font_obj = get_font(px(size, resolution), font_name, *BOLD_FONT_FALLBACKS, *REGULAR_FONT_FALLBACKS)
     
     color_map = {
         'white': (255, 255, 255), 'black': (0, 0, 0), 'red': (255, 0, 0),
@@ -75,6 +814,7 @@ def create_text_with_shadow(text, font_name, color, size, resolution=RESOLUTION,
     }
     text_color = color_map.get(color.lower(), (255, 255, 255)) if isinstance(color, str) else color
     
+    # Wrapped in design units, so previews break lines where the final render does
     lines = []
     for line in text.split('\n'):
         if line.strip():
@@ -83,11 +823,13 @@ def create_text_with_shadow(text, font_name, color, size, resolution=RESOLUTION,
         else:
             lines.append('')
     
-    total_height = len(lines) * (size + 15)
-    y_offset = (resolution[1] - total_height) // 2 + shake_offset[1]
+    line_height = px(size + 15, resolution)
+    total_height = len(lines) * line_height
+    y_offset = (resolution[1] - total_height) // 2 + px(shake_offset[1], resolution)
     
     if shadow:
-        padding = 30
+        padding = px(30, resolution)
+        margin = px(20, resolution)
         bg_box = Image.new('RGBA', resolution, (0, 0, 0, 0))
         bg_draw = ImageDraw.Draw(bg_box)
         
@@ -98,14 +840,15 @@ def create_text_with_shadow(text, font_name, color, size, resolution=RESOLUTION,
                 line_width = bbox[2] - bbox[0]
                 max_width_actual = max(max_width_actual, line_width)
         
-        left = max(20, (resolution[0] - max_width_actual) // 2 - padding + shake_offset[0])
+        left = max(margin, (resolution[0] - max_width_actual) // 2 - padding + px(shake_offset[0], resolution))
         top = y_offset - padding
-        right = min(resolution[0] - 20, left + max_width_actual + 2 * padding)
+        right = min(resolution[0] - margin, left + max_width_actual + 2 * padding)
         bottom = top + total_height + 2 * padding
-        bg_draw.rounded_rectangle([left, top, right, bottom], radius=20, fill=(0, 0, 0, 180))
+        bg_draw.rounded_rectangle([left, top, right, bottom], radius=px(20, resolution), fill=(0, 0, 0, 180))
         img = Image.alpha_composite(img, bg_box)
         draw = ImageDraw.Draw(img)
     
+    drop = px(3, resolution)
     for line in lines:
         if line.strip():
             bbox = draw.textbbox((0, 0), line, font=font_obj)
@@ -113,61 +856,91 @@ def create_text_with_shadow(text, font_name, color, size, resolution=RESOLUTION,
             x = (resolution[0] - text_width) // 2
             
             if shadow:
-                draw.text((x + 3, y_offset + 3), line, font=font_obj, fill=(0, 0, 0, 200))
+                draw.text((x + drop, y_offset + drop), line, font=font_obj, fill=(0, 0, 0, 200))
             draw.text((x, y_offset), line, font=font_obj, fill=text_color)
-        y_offset += size + 15
+        y_offset += line_height
     
-    return np.array(img)
+    return crop_to_sprite(np.array(img))
 
-def create_circular_timer(time_left, resolution=RESOLUTION):
-    """Create a circular countdown timer overlay."""
-    img = Image.new('RGBA', resolution, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    center_x = resolution[0] // 2
-    center_y = 200
-    radius = 80
-    
-    draw.ellipse([center_x - radius, center_y - radius, 
-                  center_x + radius, center_y + radius], 
-                 fill=(0, 0, 0, 180), outline=(57, 255, 20, 255), width=8)
-    
-    try:
-        font = ImageFont.truetype("C:\\Windows\\Fonts\\arialbd.ttf", TIMER_FONT_SIZE)
-    except:
-        font = ImageFont.load_default()
-    
-    text = str(time_left)
-    bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-    
-    text_x = center_x - text_width // 2
-    text_y = center_y - text_height // 2
-    
+def timer_color(time_left):
+    """Digit color for the countdown: green, orange at <= 5 seconds, red at <= 3."""
     if time_left <= 3:
-        color = (255, 0, 0)
+        return (255, 0, 0)
     elif time_left <= 5:
-        color = (255, 165, 0)
-    else:
-        color = (57, 255, 20)
-    
-    draw.text((text_x, text_y), text, font=font, fill=color)
-    
-    return np.array(img)
+        return (255, 165, 0)
+    return (57, 255, 20)
+
+def create_countdown_clip(duration, resolution=None):
+    """Countdown timer as a single clip with a progress ring that drains smoothly over ``duration`` seconds.
+    
+    The disc, the ring geometry (coverage and clockwise angle from 12 o'clock) and one sprite per digit
+    are prepared up front; each frame only masks the ring by the remaining fraction and pastes a digit.
+    """
+    resolution = resolution or RESOLUTION
+    radius = px(TIMER_RADIUS, resolution)
+    ring_width = px(TIMER_RING_WIDTH, resolution)
+    size = 2 * radius + 1
+    center = radius
+    
+    yy, xx = np.mgrid[0:size, 0:size].astype(np.float32)
+    dist = np.hypot(xx - center, yy - center)
+    disc_alpha = np.clip(radius + 0.5 - dist, 0, 1)
+    ring_alpha = np.clip(np.minimum(dist - (radius - ring_width) + 0.5, radius + 0.5 - dist), 0, 1)
+    angle = (np.arctan2(xx - center, center - yy) / (2 * np.pi)) % 1.0
+    
+    base_rgb = np.zeros((size, size, 3), dtype=np.float32)
+    base_alpha = disc_alpha * (180 / 255)
+    ring_rgb = np.array(TIMER_RING_COLOR, dtype=np.float32)
+    elapsed_ring_alpha = ring_alpha * 0.25  # drained part of the ring stays faintly visible
+    
+    font = get_font(px(TIMER_FONT_SIZE, resolution), *BOLD_FONT_FALLBACKS)
+    digits = {}
+    for time_left in range(1, int(np.ceil(duration)) + 1):
+        text = str(time_left)
+        canvas = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(canvas)
+        bbox = draw.textbbox((0, 0), text, font=font)
+        draw.text((center - (bbox[2] - bbox[0]) // 2, center - (bbox[3] - bbox[1]) // 2), text,
+                  font=font, fill=timer_color(time_left))
+        glyph = np.asarray(canvas, dtype=np.float32)
+        digits[time_left] = (glyph[:, :, :3], glyph[:, :, 3:] / 255)
+    
+    last = {'frame': (None, None, None)}  # replaced as one tuple so concurrent callers never see a torn update
+    
+    def render(t):
+        frame = last['frame']
+        if frame[0] != t:
+            remaining = max(duration - t, 0)
+            time_left = min(max(int(np.ceil(remaining)), 1), len(digits))
+            visible = np.where(angle < remaining / duration, ring_alpha, elapsed_ring_alpha)[:, :, None]
+            alpha = base_alpha[:, :, None]
+            rgb = base_rgb * alpha
+            # "over" compositing of ring, then digit, in premultiplied form
+            rgb = ring_rgb * visible + rgb * (1 - visible)
+            alpha = visible + alpha * (1 - visible)
+            glyph_rgb, glyph_alpha = digits[time_left]
+            rgb = glyph_rgb * glyph_alpha + rgb * (1 - glyph_alpha)
+            alpha = glyph_alpha + alpha * (1 - glyph_alpha)
+            frame = (t, (rgb / np.maximum(alpha, 1e-6)).clip(0, 255).astype(np.uint8), alpha[:, :, 0])
+            last['frame'] = frame
+        return frame
+    
+    mask = VideoClip(lambda t: render(t)[2], ismask=True, duration=duration)
+    clip = VideoClip(lambda t: render(t)[1], duration=duration).set_mask(mask)
+    clip.cache_key = ('countdown', duration, tuple(resolution), getattr(font, 'path', None))
+    return clip.set_position((resolution[0] // 2 - radius, px(TIMER_CENTER_Y, resolution) - radius))
 
-def create_highlight_animation(text, font_name, size, resolution=RESOLUTION):
+@cached_overlay
+def create_highlight_animation(text, font_name, size, resolution=None):
     """Create highlighted correct answer reveal."""
+    resolution = resolution or RESOLUTION
     img = Image.new('RGBA', resolution, (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
     
-    try:
-        font = ImageFont.truetype("C:\\Windows\\Fonts\\arialbd.ttf", size + 20)
-    except:
-        font = ImageFont.load_default()
+    font = get_font(px(size + 20, resolution), *BOLD_FONT_FALLBACKS)
     
     wrapped_lines = textwrap.fill(text, width=25).split('\n')
-    line_height = size + 30
+    line_height = px(size + 30, resolution)
     total_height = len(wrapped_lines) * line_height
     
     y_start = (resolution[1] - total_height) // 2
@@ -179,16 +952,17 @@ def create_highlight_animation(text, font_name, size, resolution=RESOLUTION):
     
     x_center = resolution[0] // 2
     
-    padding = 40
-    for offset in range(30, 0, -5):
-        alpha = int(100 * (offset / 30))
+    padding = px(40, resolution)
+    for glow in range(30, 0, -5):
+        alpha = int(100 * (glow / 30))
+        offset = px(glow, resolution)
         draw.rounded_rectangle([x_center - max_width//2 - offset - padding, y_start - offset - padding,
                               x_center + max_width//2 + offset + padding, y_start + total_height + offset + padding],
-                              radius=30, fill=(0, 255, 0, alpha))
+                              radius=px(30, resolution), fill=(0, 255, 0, alpha))
     
     draw.rounded_rectangle([x_center - max_width//2 - padding, y_start - padding,
                           x_center + max_width//2 + padding, y_start + total_height + padding],
-                          radius=20, fill=(0, 200, 0, 255))
+                          radius=px(20, resolution), fill=(0, 200, 0, 255))
     
     y_pos = y_start
     for line in wrapped_lines:
@@ -198,19 +972,17 @@ def create_highlight_animation(text, font_name, size, resolution=RESOLUTION):
         draw.text((x, y_pos), line, font=font, fill=(255, 255, 255))
         y_pos += line_height
     
-    return np.array(img)
+    return crop_to_sprite(np.array(img))
 
-def create_fact_text_with_header(fact_text, font_name, color, size, resolution=RESOLUTION):
+@cached_overlay
+def create_fact_text_with_header(fact_text, font_name, color, size, resolution=None):
     """Create fun fact with 'Did You Know?' header."""
+    resolution = resolution or RESOLUTION
     img = Image.new('RGBA', resolution, (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
     
-    try:
-        header_font = ImageFont.truetype("C:\\Windows\\Fonts\\arialbd.ttf", size + 15)
-        body_font = ImageFont.truetype("C:\\Windows\\Fonts\\arial.ttf", size - 5)
-    except:
-        header_font = ImageFont.load_default()
-        body_font = ImageFont.load_default()
+    header_font = get_font(px(size + 15, resolution), *BOLD_FONT_FALLBACKS)
+    body_font = get_font(px(size - 5, resolution), *REGULAR_FONT_FALLBACKS)
     
     color_map = {
         'white': (255, 255, 255), 'yellow': (255, 255, 0), 'black': (0, 0, 0)
@@ -225,15 +997,17 @@ def create_fact_text_with_header(fact_text, font_name, color, size, resolution=R
     header_width = header_bbox[2] - header_bbox[0]
     header_height = header_bbox[3] - header_bbox[1]
     
-    total_height = header_height + 40 + len(fact_lines) * (size + 10)
-    y_start = (resolution[1] - total_height) // 2 + 150
+    gap = px(40, resolution)
+    line_height = px(size + 10, resolution)
+    total_height = header_height + gap + len(fact_lines) * line_height
+    y_start = (resolution[1] - total_height) // 2 + px(150, resolution)
     
     max_width = header_width
     for line in fact_lines:
         bbox = draw.textbbox((0, 0), line, font=body_font)
         max_width = max(max_width, bbox[2] - bbox[0])
     
-    padding = 40
+    padding = px(40, resolution)
     left = (resolution[0] - max_width) // 2 - padding
     top = y_start - padding
     right = left + max_width + 2 * padding
@@ -241,569 +1015,1039 @@ def create_fact_text_with_header(fact_text, font_name, color, size, resolution=R
     
     bg_box = Image.new('RGBA', resolution, (0, 0, 0, 0))
     bg_draw = ImageDraw.Draw(bg_box)
-    bg_draw.rounded_rectangle([left, top, right, bottom], radius=20, fill=(0, 0, 0, 180))
+    bg_draw.rounded_rectangle([left, top, right, bottom], radius=px(20, resolution), fill=(0, 0, 0, 180))
     img = Image.alpha_composite(img, bg_box)
     draw = ImageDraw.Draw(img)
     
+    drop = px(2, resolution)
     header_x = (resolution[0] - header_width) // 2
-    draw.text((header_x + 2, y_start + 2), header, font=header_font, fill=(0, 0, 0, 200))
+    draw.text((header_x + drop, y_start + drop), header, font=header_font, fill=(0, 0, 0, 200))
     draw.text((header_x, y_start), header, font=header_font, fill=(255, 215, 0))
     
-    y_pos = y_start + header_height + 40
+    y_pos = y_start + header_height + gap
     for line in fact_lines:
         bbox = draw.textbbox((0, 0), line, font=body_font)
         line_width = bbox[2] - bbox[0]
         x = (resolution[0] - line_width) // 2
-        draw.text((x + 2, y_pos + 2), line, font=body_font, fill=(0, 0, 0, 200))
+        draw.text((x + drop, y_pos + drop), line, font=body_font, fill=(0, 0, 0, 200))
         draw.text((x, y_pos), line, font=body_font, fill=text_color)
-        y_pos += size + 10
+        y_pos += line_height
     
-    return np.array(img)
-
-def apply_blur_to_image(image_path, blur_radius=30):
-    """Apply Gaussian blur to an image."""
-    img = Image.open(image_path).convert('RGBA')
-    img = img.resize(RESOLUTION, Image.Resampling.LANCZOS)
-    blurred = img.filter(ImageFilter.GaussianBlur(radius=blur_radius))
-    return np.array(blurred)
+    return crop_to_sprite(np.array(img))
 
-# Video creation functions
-def create_quiz_video(data):
-    """Generate quiz video."""
-    timer_duration = data.get('timer', 10)
-    answer_reveal_duration = 5
-    total_duration = INTRO_DURATION + timer_duration + answer_reveal_duration + OUTRO_DURATION
+def stepped_shake(offsets=SHAKE_OFFSETS, duration=INTRO_DURATION):
+    """Shake curve that holds each (dx, dy) offset for an equal share of the duration."""
+    step = duration / len(offsets)
     
-    if total_duration > 90:
-        total_duration = 90
+    def offset_at(t):
+        return offsets[min(int(t / step), len(offsets) - 1)]
+    return offset_at
+
+def procedural_shake(amplitude=5, frequency=12, decay=0.0, seed=0):
+    """Continuous shake curve built from two incommensurate sines per axis with random phases.
+    
+    ``decay`` > 0 makes the shake die out exponentially (amplitude * exp(-decay * t)).
+    """
+    rng = np.random.default_rng(seed)
+    phases = rng.uniform(0, 2 * np.pi, 4)
+    
+    def offset_at(t):
+        envelope = amplitude * np.exp(-decay * t)
+        w = 2 * np.pi * frequency * t
+        dx = envelope * 0.5 * (np.sin(w + phases[0]) + np.sin(1.618 * w + phases[1]))
+        dy = envelope * 0.5 * (np.sin(1.13 * w + phases[2]) + np.sin(1.77 * w + phases[3]))
+        return int(round(dx)), int(round(dy))
+    return offset_at
+
+def create_shake_text_clip(text, font_name, color, size, duration, shake=None):
+    """Rasterise text once and shake it by moving the single clip with a per-frame offset."""
+    shake_name = None if callable(shake) else (shake or 'steps')  # custom curves are not cacheable
+    if shake is None or shake == 'steps':
+        shake = stepped_shake(duration=duration)
+    elif shake == 'smooth':
+        shake = procedural_shake()
+    elif not callable(shake):
+        raise ValueError(f"unknown shake {shake!r} (choose from {', '.join(SHAKE_STYLES)})")
+    text_sprite = create_text_with_shadow(text, font_name, color, size)
+    x, y = text_sprite.position
+    
+    def position(t):
+        dx, dy = shake(t)
+        return x + px(dx), y + px(dy)
+    clip = ImageClip(text_sprite.image).set_duration(duration).set_position(position)
+    if shake_name is not None:
+        clip.cache_key = ('shake', array_digest(text_sprite.image), (x, y), shake_name, duration)
+    return clip
+
+@tracer.traced(category='load')
+def build_blur_pyramid(image_path, radii, resolution=None):
+    """Decode and resize an image once, then blur it at each radius.
+    
+    Large radii are blurred on a downscaled copy (radius shrinks with it) and upsampled back,
+    which looks the same at a fraction of the cost of a full-resolution GaussianBlur.
+    """
+    resolution = resolution or RESOLUTION
+    img = Image.fromarray(load_image(image_path, size=resolution)).convert('RGB')
+    levels = {}
+    for radius in sorted(set(radii)):
+        if radius <= 0:
+            levels[radius] = np.array(img)
+            continue
+        scale = int(min(max(radius // BLUR_PYRAMID_DETAIL, 1), BLUR_PYRAMID_MAX_SCALE))
+        small = img.resize((resolution[0] // scale, resolution[1] // scale), Image.Resampling.BILINEAR)
+        blurred = small.filter(ImageFilter.GaussianBlur(radius=radius / scale))
+        levels[radius] = np.array(blurred.resize(resolution, Image.Resampling.BILINEAR))
+    return levels
+
+def create_blur_reveal_clip(image_path, keyframes, resolution=None):
+    """Clip that sharpens an image along ``keyframes`` [(time, blur_radius), ...].
+    
+    The radius is interpolated linearly between keyframes and each frame cross-fades the two
+    nearest levels of a precomputed blur pyramid.
+    """
+    resolution = resolution or RESOLUTION
+    keyframes = [(t, radius * layout_scale(resolution)) for t, radius in keyframes]
+    times = [t for t, _ in keyframes]
+    radii = [r for _, r in keyframes]
+    levels = build_blur_pyramid(image_path, radii, resolution)
+    level_radii = sorted(levels)
+    last = {'frame': (None, None)}
+    
+    def make_frame(t):
+        cached_t, frame = last['frame']
+        if cached_t != t:
+            radius = float(np.interp(t, times, radii))
+            i = min(bisect.bisect_left(level_radii, radius), len(level_radii) - 1)
+            if level_radii[i] == radius or i == 0:
+                frame = levels[level_radii[i]]
+            else:
+                lo, hi = level_radii[i - 1], level_radii[i]
+                weight = int(round(256 * (radius - lo) / (hi - lo)))
+                frame = ((levels[lo].astype(np.uint16) * (256 - weight) + levels[hi] * np.uint16(weight)) >> 8).astype(np.uint8)
+            last['frame'] = (t, frame)
+        return frame
+    
+    clip = VideoClip(make_frame, duration=times[-1])
+    clip.cache_key = ('blur_reveal', file_digest(image_path), tuple(keyframes), tuple(resolution))
+    return clip
+
+# Timeline compositor
+Premultiplied = namedtuple('Premultiplied', ['rgb', 'inverse_alpha'])  # uint8 colour * alpha / 255, uint8 255 - alpha (None if opaque)
+
+_blend_scratch = threading.local()
+
+def premultiply(rgb, mask=None):
+    """Premultiplied-alpha form of a frame and its optional float (0-1) mask."""
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    if mask is None:
+        return Premultiplied(rgb, None)
+    alpha = np.rint(np.asarray(mask, dtype=np.float32) * 255).astype(np.uint8)[:, :, None]
+    if alpha.min() == 255:
+        return Premultiplied(rgb, None)
+    # Floor here and round in the blend so colour + background never exceeds 255
+    return Premultiplied((rgb * alpha.astype(np.uint16) // 255).astype(np.uint8), 255 - alpha)
+
+def blend_premultiplied(frame, sprite, x, y):
+    """Draw a Premultiplied sprite over ``frame`` in place with its top-left corner at (x, y).
+    
+    frame = rgb + round(frame * (255 - alpha) / 255), in uint16 arithmetic on per-thread scratch buffers.
+    Works for 4-channel frames as well (premultiplied RGBA "over" RGBA), which is how static overlays are fused.
+    """
+    h, w = sprite.rgb.shape[:2]
+    frame_h, frame_w = frame.shape[:2]
+    x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + w, frame_w), min(y + h, frame_h)
+    if x0 >= x1 or y0 >= y1:
+        return
+    source = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+    region = frame[y0:y1, x0:x1]
+    if sprite.inverse_alpha is None:
+        region[...] = sprite.rgb[source]
+        return
+    size = region.size
+    if getattr(_blend_scratch, 'size', 0) < size:
+        _blend_scratch.work = np.empty(size, dtype=np.uint16)
+        _blend_scratch.carry = np.empty(size, dtype=np.uint16)
+        _blend_scratch.size = size
+    work = _blend_scratch.work[:size].reshape(region.shape)
+    carry = _blend_scratch.carry[:size].reshape(region.shape)
+    np.multiply(region, sprite.inverse_alpha[source], out=work, dtype=np.uint16)
+    # Exact round(x / 255) for x <= 255 * 255: (x + 128 + ((x + 128) >> 8)) >> 8
+    work += 128
+    np.right_shift(work, 8, out=carry)
+    work += carry
+    work >>= 8
+    work += sprite.rgb[source]
+    region[...] = work
+
+def layer_position(layer, t, frame_shape, image_shape):
+    """Integer top-left position of a clip at clip time ``t``, resolved the way moviepy's blit_on does."""
+    frame_h, frame_w = frame_shape[:2]
+    image_h, image_w = image_shape[:2]
+    pos = layer.pos(t)
+    if isinstance(pos, str):
+        pos = {'center': ['center', 'center'], 'left': ['left', 'center'], 'right': ['right', 'center'],
+               'top': ['center', 'top'], 'bottom': ['center', 'bottom']}[pos]
+    else:
+        pos = list(pos)
+    if layer.relative_pos:
+        for i, dim in enumerate([frame_w, frame_h]):
+            if not isinstance(pos[i], str):
+                pos[i] = dim * pos[i]
+    if isinstance(pos[0], str):
+        pos[0] = {'left': 0, 'center': (frame_w - image_w) / 2, 'right': frame_w - image_w}[pos[0]]
+    if isinstance(pos[1], str):
+        pos[1] = {'top': 0, 'center': (frame_h - image_h) / 2, 'bottom': frame_h - image_h}[pos[1]]
+    return int(pos[0]), int(pos[1])
+
+def is_image(clip):
+    """True if a clip's pixels (and mask) never change, though its position may."""
+    return isinstance(clip, ImageClip) and (clip.mask is None or isinstance(clip.mask, ImageClip))
+
+def layer_sprite(layer, t):
+    """Premultiplied frame of a layer at clip time ``t``."""
+    image = layer.get_frame(t)
+    mask = layer.mask.get_frame(t) if layer.mask is not None else None
+    if mask is not None and image.shape[:2] != mask.shape[:2]:
+        image = layer.fill_array(image, mask.shape)
+    return premultiply(image, mask)
+
+def fuse_sprites(placed_sprites, frame_shape):
+    """Flatten [(Premultiplied, (x, y))] drawn in order into one sprite over their bounding box, or None
+    if the box is larger than the sprites themselves (e.g. two small overlays in opposite corners)."""
+    frame_h, frame_w = frame_shape[:2]
+    boxes = []
+    for sprite, (x, y) in placed_sprites:
+        h, w = sprite.rgb.shape[:2]
+        boxes.append((max(x, 0), max(y, 0), min(x + w, frame_w), min(y + h, frame_h)))
+    boxes = [box for box in boxes if box[0] < box[2] and box[1] < box[3]]
+    if not boxes:
+        return None
+    x0, y0 = min(box[0] for box in boxes), min(box[1] for box in boxes)
+    x1, y1 = max(box[2] for box in boxes), max(box[3] for box in boxes)
+    if (x1 - x0) * (y1 - y0) > sum((bx1 - bx0) * (by1 - by0) for bx0, by0, bx1, by1 in boxes):
+        return None
+    canvas = np.zeros((y1 - y0, x1 - x0, 4), dtype=np.uint8)
+    for sprite, (x, y) in placed_sprites:
+        alpha = 255 - sprite.inverse_alpha if sprite.inverse_alpha is not None else np.full(sprite.rgb.shape[:2] + (1,), 255, np.uint8)
+        blend_premultiplied(canvas, Premultiplied(np.concatenate([sprite.rgb, alpha], axis=2), sprite.inverse_alpha),
+                            x - x0, y - y0)
+    return Premultiplied(canvas[:, :, :3].copy(), 255 - canvas[:, :, 3:]), (x0, y0)
+
+class FramePool:
+    """Frame buffers handed back by the encoder once written, so compositing does not allocate per frame."""
     
-    bg_clip = load_background(data['background'], total_duration)
+    def __init__(self, shape, limit):
+        self.shape = shape
+        self.limit = limit
+        self._free = deque()
     
-    logo_clip = None
-    if 'logo' in data and os.path.exists(data['logo']):
+    def acquire(self):
         try:
-            logo_clip = ImageClip(data['logo']).resize(height=120).set_position((50, 50)).set_duration(total_duration)
-        except Exception as e:
-            print(f"Warning: Could not load logo - {e}")
+            return self._free.pop()
+        except IndexError:
+            return np.empty(self.shape, dtype=np.uint8)
     
-    all_clips = []
-    current_time = 0
+    def release(self, frame):
+        if len(self._free) < self.limit and frame.shape == self.shape and frame.flags.writeable:
+            self._free.append(frame)
+
+def is_time_invariant(clip, duration):
+    """True if a clip (and its mask and position) looks the same at every time of its interval."""
+    if not is_image(clip):
+        return False
+    positions = {tuple(clip.pos(t)) for t in np.linspace(0, duration, 9)}
+    return len(positions) == 1
+
+class Timeline:
+    """Flat list of layers with [start, end) intervals, composited by a single make_frame.
     
-    shake_offsets = [(5, 3), (-3, -5), (4, 2), (-2, -3), (0, 0), (3, -2), (-4, 4), (2, -1)]
-    frame_duration = INTRO_DURATION / len(shake_offsets)
+    Layers are drawn in the order they were added. Continuous tracks such as the background and the
+    logo are added once for the whole video instead of being sliced per segment. Within each interval
+    the bottom run of time-invariant layers is composited once and reused for every frame.
     
-    intro_clips = []
-    for offset in shake_offsets:
-        intro_img = create_text_with_shadow("Movie Quiz Time!", data.get('font', 'Arial'), 
-                                           data.get('font_color', 'white'), FONT_SIZE + 10, shake_offset=offset)
-        intro_text = ImageClip(intro_img).set_duration(frame_duration)
-        intro_bg = bg_clip.subclip(current_time, current_time + frame_duration)
-        
-        layers = [intro_bg, intro_text]
-        if logo_clip:
-            layers.append(logo_clip.subclip(current_time, current_time + frame_duration))
-        
-        intro_composite = CompositeVideoClip(layers, size=RESOLUTION)
-        intro_clips.append(intro_composite)
-        current_time += frame_duration
+    Each interval is also a segment that can be encoded on its own. A segment gets a cache key when every
+    active layer is identifiable: static images by their pixels, dynamic clips by their ``cache_key``.
+    """
     
-    all_clips.extend(intro_clips)
+    def __init__(self, size=None):
+        self.size = size or RESOLUTION
+        self.layers = []
     
-    question_text = f"{data['question']}\n\n" + "\n".join(data['options'])
-    question_img = create_text_with_shadow(question_text, data.get('font', 'Arial'),
-                                          data.get('font_color', 'white'), FONT_SIZE - 5)
-    
-    for t in range(timer_duration, 0, -1):
-        bg_segment = bg_clip.subclip(current_time, current_time + 1)
-        question_overlay = ImageClip(question_img).set_duration(1)
-        timer_img = create_circular_timer(t)
-        timer_overlay = ImageClip(timer_img).set_duration(1)
-        
-        layers = [bg_segment, question_overlay, timer_overlay]
-        if logo_clip:
-            layers.append(logo_clip.subclip(current_time, current_time + 1))
+    def add(self, clip, start=0, end=None, static=None):
+        """Add ``clip`` (in its own local time) playing from ``start`` until ``end`` (default: to the end).
         
-        composite = CompositeVideoClip(layers, size=RESOLUTION)
-        all_clips.append(composite)
-        current_time += 1
+        ``static`` overrides the automatic time-invariance detection for the layer.
+        """
+        self.layers.append((clip, start, end, static))
+        return clip
     
-    answer_img = create_highlight_animation(f"Correct Answer:\n{data['correct_answer']}", 
-                                           data.get('font', 'Arial'), FONT_SIZE)
-    answer_overlay = ImageClip(answer_img).set_duration(answer_reveal_duration)
-    answer_bg = bg_clip.subclip(current_time, current_time + answer_reveal_duration)
+    @property
+    def duration(self):
+        ends = [end for _, _, end, _ in self.layers if end is not None]
+        return max(ends) if ends else max(clip.duration for clip, _, _, _ in self.layers)
+    
+    def _placed_layers(self, duration):
+        placed = []
+        for clip, start, end, static in self.layers:
+            end = duration if end is None else min(end, duration)
+            if end > start:
+                if static is None:
+                    static = is_time_invariant(clip, end - start)
+                placed.append((clip.set_duration(end - start).set_start(start), static))
+        return placed
+    
+    def to_clip(self):
+        """Build the composited VideoClip (with the layers' own audio, if any).
+        
+        The clip carries ``segment_bounds`` (times where the set of layers changes), ``segments``
+        ([(start, end, key parts or None)]) and ``static_fraction`` (share of the duration where
+        nothing moves) for the encoder.
+        """
+        duration = self.duration
+        placed = self._placed_layers(duration)
+        layers = [layer for layer, _ in placed]
+        static_layers = {id(layer) for layer, static in placed if static}
+        
+        # Interval index: between two consecutive layer boundaries the set of active layers is fixed
+        bounds = sorted({0} | {layer.start for layer in layers} | {layer.end for layer in layers})
+        active = [[layer for layer in layers if layer.start <= lo < layer.end] for lo in bounds[:-1]]
+        static_prefix = []
+        for interval in active:
+            count = 0
+            while count < len(interval) and id(interval[count]) in static_layers:
+                count += 1
+            static_prefix.append(count)
+        frame_shape = (self.size[1], self.size[0], 3)
+        pool = FramePool(frame_shape, RENDER_QUEUE_FRAMES + 2 * RENDER_WORKERS + 2)
+        sprites = {}  # id(layer) -> Premultiplied for layers whose pixels never change
+        
+        def fixed_sprite(layer, t):
+            if id(layer) not in sprites:
+                sprites[id(layer)] = layer_sprite(layer, t - layer.start)
+            return sprites[id(layer)]
+        
+        def draw_sprite(sprite, x, y):
+            return lambda frame, t: blend_premultiplied(frame, sprite, x, y)
+        
+        def draw_moving(layer):
+            def draw(frame, t):
+                ct = t - layer.start
+                sprite = fixed_sprite(layer, t) if is_image(layer) else layer_sprite(layer, ct)
+                x, y = layer_position(layer, ct, frame_shape, sprite.rgb.shape)
+                blend_premultiplied(frame, sprite, x, y)
+            return draw
+        
+        def build_interval(i):
+            """Composite the static base of interval ``i`` and list the draw steps for the layers above it."""
+            lo = bounds[i]
+            base = np.zeros(frame_shape, dtype=np.uint8)
+            for layer in active[i][:static_prefix[i]]:
+                sprite = fixed_sprite(layer, lo)
+                blend_premultiplied(base, sprite, *layer_position(layer, lo - layer.start, frame_shape, sprite.rgb.shape))
+            steps = []
+            run = []  # consecutive static layers above a moving one, fused into a single blend when compact
+            for layer in active[i][static_prefix[i]:] + [None]:
+                if layer is not None and id(layer) in static_layers:
+                    sprite = fixed_sprite(layer, lo)
+                    run.append((sprite, layer_position(layer, lo - layer.start, frame_shape, sprite.rgb.shape)))
+                    continue
+                if run:
+                    fused = fuse_sprites(run, frame_shape) if len(run) > 1 else None
+                    for sprite, (x, y) in [fused] if fused else run:
+                        steps.append(draw_sprite(sprite, x, y))
+                    run = []
+                if layer is not None:
+                    steps.append(draw_moving(layer))
+            base.flags.writeable = False  # returned as is when nothing moves; FramePool never recycles it
+            return base, steps
+        
+        cached = {'interval': (None, None, None)}  # (interval, base, steps), replaced atomically for the compositor threads
+        
+        def make_frame(t):
+            i = min(max(bisect.bisect_right(bounds, t) - 1, 0), len(active) - 1)
+            interval, base, steps = cached['interval']
+            if interval != i:
+                base, steps = build_interval(i)
+                cached['interval'] = (i, base, steps)
+            if not steps:
+                return base
+            frame = pool.acquire()
+            np.copyto(frame, base)
+            for draw in steps:
+                draw(frame, t)
+            return frame
+        
+        clip = VideoClip(make_frame, duration=duration)
+        audio_tracks = [layer.audio for layer in layers if layer.audio is not None]
+        if audio_tracks:
+            clip = clip.set_audio(CompositeAudioClip(audio_tracks).set_duration(duration))
+        clip.frame_pool = pool
+        clip.segment_bounds = bounds
+        clip.segments = self._segment_keys(placed, bounds, active)
+        clip.static_fraction = sum(hi - lo for lo, hi, interval, prefix in zip(bounds, bounds[1:], active, static_prefix)
+                                   if prefix == len(interval)) / duration
+        return clip
     
-    layers = [answer_bg, answer_overlay]
+    @staticmethod
+    def _segment_keys(placed, bounds, active):
+        layer_keys = {}
+        for layer, static in placed:
+            key = getattr(layer, 'cache_key', None)
+            if key is None and static:
+                mask_digest = array_digest(layer.mask.img) if layer.mask is not None else None
+                key = ('image', array_digest(layer.img), mask_digest, tuple(layer.pos(0)))
+            layer_keys[id(layer)] = (key, static)
+        segments = []
+        for lo, hi, interval in zip(bounds, bounds[1:], active):
+            parts = []
+            for layer in interval:
+                key, static = layer_keys[id(layer)]
+                if key is None:
+                    parts = None
+                    break
+                # Moving layers also depend on which part of them falls inside the segment
+                parts.append(key if static else (key, round(lo - layer.start, 4)))
+            segments.append((lo, hi, parts))
+        return segments
+    
+    def close(self):
+        for clip, _, _, _ in self.layers:
+            try:
+                clip.close()
+            except Exception as e:
+                print(f"Warning: Failed to close clip - {e}")
+
+def load_logo(data):
+    """Logo clip for the top-left corner, or None if the entry has no usable logo."""
+    if 'logo' in data and os.path.exists(data['logo']):
+        try:
+            return image_clip(data['logo'], height=px(120)).set_position((px(50), px(50)))
+        except Exception as e:
+            print(f"Warning: Could not load logo - {e}")
+    return None
+
+def add_logo(timeline, data):
+    """Add the logo as a continuous top layer."""
+    logo_clip = load_logo(data)
     if logo_clip:
-        layers.append(logo_clip.subclip(current_time, current_time + answer_reveal_duration))
-    
-    answer_composite = CompositeVideoClip(layers, size=RESOLUTION)
-    all_clips.append(answer_composite)
-    current_time += answer_reveal_duration
-    
-    outro_clips = []
-    for offset in shake_offsets:
-        outro_img = create_text_with_shadow(OUTRO_TEXT_QUIZ, data.get('font', 'Arial'),
-                                           data.get('font_color', 'white'), FONT_SIZE, shake_offset=offset)
-        outro_overlay = ImageClip(outro_img).set_duration(frame_duration)
-        outro_bg = bg_clip.subclip(current_time, min(current_time + frame_duration, bg_clip.duration))
+        timeline.add(logo_clip)
+
+def encode_clip(clip, output_path, ffmpeg_params=(), audio_path=None, fps=None, workers=RENDER_WORKERS,
+                num_frames=None):
+    """Composite frames on worker threads and stream them to ffmpeg from a writer thread.
+    
+    Frames are produced in order into a bounded queue, so compositing the next frames overlaps with
+    x264 encoding the previous ones. Returns the pipeline statistics: time the encoder sat waiting
+    for frames means compositing is the bottleneck, time the compositors sat blocked on a full queue
+    means encoding is. ``num_frames`` defaults to the frames that start within the clip.
+    """
+    fps = fps or FPS
+    if num_frames is None:
+        num_frames = int(np.ceil(clip.duration * fps - 1e-6))
+    width, height = clip.size
+    cmd = [ffmpeg_binary(), '-y', '-loglevel', 'error', '-f', 'rawvideo', '-vcodec', 'rawvideo',
+           '-s', f"{width}x{height}", '-pix_fmt', 'rgb24', '-r', f"{fps:.02f}", '-an', '-i', '-']
+    if audio_path:
+        cmd += ['-i', audio_path, '-acodec', 'copy']
+    cmd += ['-vcodec', 'libx264'] + list(ffmpeg_params)
+    if width % 2 == 0 and height % 2 == 0:
+        cmd += ['-pix_fmt', 'yuv420p']
+    cmd.append(output_path)
+    
+    stats = {'frames': 0, 'queue_depth': 0, 'encoder_starved': 0.0, 'compositor_blocked': 0.0}
+    frames = queue.Queue(maxsize=RENDER_QUEUE_FRAMES)
+    write_errors = []
+    frame_pool = getattr(clip, 'frame_pool', None)  # written frames go back to the compositor for reuse
+    
+    with tempfile.TemporaryFile() as ffmpeg_log:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=ffmpeg_log,
+                                bufsize=ENCODER_PIPE_BUFFER)
         
-        layers = [outro_bg, outro_overlay]
-        if logo_clip:
-            layers.append(logo_clip.subclip(current_time, min(current_time + frame_duration, bg_clip.duration)))
+        def sampled_span(name, index):
+            if index % TRACE_SAMPLE_EVERY:
+                return contextlib.nullcontext()
+            return tracer.span(name, 'encode', frame=index)
         
-        outro_composite = CompositeVideoClip(layers, size=RESOLUTION)
-        outro_clips.append(outro_composite)
-        current_time += frame_duration
-    
-    all_clips.extend(outro_clips)
-    
-    final_clip = concatenate_videoclips(all_clips, method="compose")
-    
+        def write_frames():
+            written = 0
+            while True:
+                wait_start = time.perf_counter()
+                frame = frames.get()
+                stats['encoder_starved'] += time.perf_counter() - wait_start
+                if frame is None:
+                    return
+                if not write_errors:
+                    try:
+                        with sampled_span('pipe write', written):
+                            proc.stdin.write(memoryview(frame))
+                        if frame_pool is not None:
+                            frame_pool.release(frame)
+                    except OSError as e:
+                        write_errors.append(e)  # keep draining so the producers never block on a dead encoder
+                written += 1
+        
+        def render_frame(index, t):
+            with sampled_span('composite', index):
+                return np.ascontiguousarray(clip.get_frame(t), dtype=np.uint8)
+        
+        def enqueue(future):
+            frame = future.result()
+            if stats['frames'] % TRACE_SAMPLE_EVERY == 0:
+                tracer.counter('encoder queue', frames=frames.qsize())
+            stats['queue_depth'] += frames.qsize()
+            put_start = time.perf_counter()
+            frames.put(frame)
+            stats['compositor_blocked'] += time.perf_counter() - put_start
+            stats['frames'] += 1
+        
+        writer = threading.Thread(target=write_frames, name='encoder-writer', daemon=True)
+        writer.start()
+        start = time.perf_counter()
+        workers = max(1, workers)
+        pending = deque()
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='compositor') as pool:
+                try:
+                    # Keep a couple of frames per worker in flight; results are consumed in frame order
+                    # Integer frame times: a float range over a cut-up timeline can yield an extra frame per piece
+                    for index in range(num_frames):
+                        pending.append(pool.submit(render_frame, index, index / fps))
+                        if len(pending) > 2 * workers:
+                            enqueue(pending.popleft())
+                    while pending:
+                        enqueue(pending.popleft())
+                finally:
+                    for future in pending:
+                        future.cancel()
+        finally:
+            frames.put(None)
+            writer.join()
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+            returncode = proc.wait()
+        stats['seconds'] = time.perf_counter() - start
+        if write_errors or returncode:
+            ffmpeg_log.seek(0)
+            message = ffmpeg_log.read().decode('utf-8', errors='replace').strip()
+            raise IOError(f"ffmpeg failed to encode {output_path}: {message or write_errors}")
+    
+    stats['queue_depth'] /= max(stats['frames'], 1)
+    return stats
+
+def print_pipeline_stats(stats):
+    """Report frame throughput and which side of the render pipeline was waiting on the other."""
+    bottleneck = 'compositing' if stats['encoder_starved'] > stats['compositor_blocked'] else 'encoding'
+    print(f"Pipeline: {stats['frames']} frames in {stats['seconds']:.1f}s "
+          f"({stats['frames'] / max(stats['seconds'], 1e-6):.1f} fps), "
+          f"avg queue depth {stats['queue_depth']:.1f}/{RENDER_QUEUE_FRAMES}, "
+          f"encoder starved {stats['encoder_starved']:.1f}s, compositors blocked {stats['compositor_blocked']:.1f}s "
+          f"- bottleneck: {bottleneck}")
+
+def encoding_settings(data=None):
+    """Encoder settings of an entry: its "encoding" profile name or {"profile": name, overrides...}, else ENCODING_PROFILE."""
+    choice = (data or {}).get('encoding', ENCODING_PROFILE)
+    if isinstance(choice, str):
+        choice = {'profile': choice}
+    settings = dict(ENCODING_PROFILES[choice.get('profile', ENCODING_PROFILE)])
+    settings.update((key, value) for key, value in choice.items() if key != 'profile')
+    return settings
+
+def encoding_problems(choice):
+    """What is wrong with an entry's "encoding" (a profile name or {"profile": name, overrides...})."""
+    if isinstance(choice, str):
+        choice = {'profile': choice}
+    if not isinstance(choice, dict):
+        return [f"encoding must be a profile name or an object, not {choice!r}"]
+    problems = []
+    profile = choice.get('profile', ENCODING_PROFILE)
+    if not isinstance(profile, str) or profile not in ENCODING_PROFILES:
+        problems.append(f"unknown encoding profile {profile!r} (choose from {', '.join(ENCODING_PROFILES)})")
+    number = lambda value: isinstance(value, (int, float)) and not isinstance(value, bool)
+    checks = {
+        'preset': (lambda value: value in X264_PRESETS, f"one of {', '.join(X264_PRESETS)}"),
+        'crf': (lambda value: number(value) and 0 <= value <= 51, "a number from 0 to 51"),
+        'gop_seconds': (lambda value: number(value) and value > 0, "a positive number"),
+        'threads': (lambda value: value is None or (isinstance(value, int) and not isinstance(value, bool)
+                                                    and value > 0), "a positive integer or null"),
+        'audio_bitrate': (lambda value: isinstance(value, str) and value[:-1].isdigit() and value[-1:] == 'k',
+                          "a bitrate such as '192k'"),
+    }
+    for key, value in choice.items():
+        if key == 'profile':
+            continue
+        if key not in checks:
+            matches = difflib.get_close_matches(key, checks, n=1)
+            problems.append(f"unknown encoding setting {key!r}" + (f" (did you mean {matches[0]!r}?)" if matches else ''))
+        elif not checks[key][0](value):
+            problems.append(f"encoding {key} must be {checks[key][1]}, not {value!r}")
+    return problems
+
+def encoder_params(settings):
+    """x264 command-line options for encoding_settings()."""
+    return ['-preset', settings['preset'], '-crf', str(settings['crf']),
+            '-g', str(max(1, int(round(settings['gop_seconds'] * FPS)))),
+            '-threads', str(settings['threads'] or ENCODER_THREADS)]
+
+def write_video(final_clip, data):
+    """Attach the looped background music (if any) and encode the clip to data['output']."""
+    settings = encoding_settings(data)
+    audio = True  # keep whatever audio the layers carry (e.g. an mp4 background)
     if 'audio' in data and os.path.exists(data['audio']):
         try:
-            audio = AudioFileClip(data['audio'])
-            if audio.duration < final_clip.duration:
-                num_loops = int(final_clip.duration / audio.duration) + 1
-                looped_audio = concatenate_videoclips([AudioFileClip(data['audio']).set_duration(audio.duration) for _ in range(num_loops)])
-                looped_audio = looped_audio.subclip(0, final_clip.duration)
-                final_clip = final_clip.set_audio(looped_audio)
-            else:
-                final_clip = final_clip.set_audio(audio.subclip(0, final_clip.duration))
+            if probe_media(data['audio'])['audio_fps'] is None:
+                raise ValueError(f"no audio stream in {data['audio']}")
+            audio = audio_bed_file(data['audio'], final_clip.duration,
+                                   seam_fade=data.get('audio_seam_fade', AUDIO_SEAM_FADE),
+                                   end_fade=data.get('audio_fade', AUDIO_END_FADE),
+                                   bitrate=settings['audio_bitrate'])
         except Exception as e:
             print(f"Warning: Could not add audio - {e}")
     
+    encoder_options = encoder_params(settings)
+    if getattr(final_clip, 'static_fraction', 0) >= STILL_IMAGE_TUNE_THRESHOLD:
+        encoder_options += ['-tune', 'stillimage']
+    
+    # Encode to a temporary name so an interrupted run never leaves a truncated file at the output path
     os.makedirs(os.path.dirname(data['output']), exist_ok=True)
-    final_clip.write_videofile(data['output'], codec='libx264', fps=FPS, audio_codec='aac', threads=4)
+    root, ext = os.path.splitext(data['output'])
+    partial_path = f"{root}.partial{ext}"
+    try:
+        use_cache = data.get('segment_cache', SEGMENT_CACHE_ENABLED)
+        chunk_jobs = data.get('chunk_jobs', CHUNK_JOBS)
+        if getattr(final_clip, 'segments', None) and (use_cache or chunk_jobs > 1):
+            write_segmented_video(final_clip, partial_path, audio, encoder_options,
+                                  workers=data.get('render_workers', RENDER_WORKERS),
+                                  data=data, chunk_jobs=chunk_jobs, cache=use_cache,
+                                  audio_bitrate=settings['audio_bitrate'])
+        else:
+            # Start a GOP at every segment change
+            ffmpeg_params = list(encoder_options)
+            segment_bounds = getattr(final_clip, 'segment_bounds', None)
+            if segment_bounds and len(segment_bounds) > 2:
+                ffmpeg_params += ['-force_key_frames', ','.join(f"{t:.3f}" for t in segment_bounds[1:-1])]
+            audio_path = audio if isinstance(audio, str) else None
+            if audio is True and final_clip.audio is not None:
+                audio_path = f"{root}.partial.m4a"
+                with tracer.span('mix layer audio', 'audio'):
+                    final_clip.audio.write_audiofile(audio_path, fps=AUDIO_FPS, codec='aac',
+                                                     bitrate=settings['audio_bitrate'], logger=None)
+            try:
+                with tracer.span('encode', 'encode', segment='full'):
+                    stats = encode_clip(final_clip, partial_path, ffmpeg_params, audio_path,
+                                        workers=data.get('render_workers', RENDER_WORKERS))
+                print_pipeline_stats(stats)
+            finally:
+                if audio_path and audio_path != audio and os.path.exists(audio_path):
+                    os.remove(audio_path)
+        os.replace(partial_path, data['output'])
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
     final_clip.close()
-    bg_clip.close()
-    if logo_clip:
-        logo_clip.close()
-    print(f"Quiz video created: {data['output']}")
 
-def create_fact_video(data):
-    """Generate fun fact video."""
-    fact_duration = 15
-    total_duration = INTRO_DURATION + fact_duration + OUTRO_DURATION
-    
-    bg_clip = load_background(data['background'], total_duration)
-    
-    logo_clip = None
-    if 'logo' in data and os.path.exists(data['logo']):
+def write_segmented_video(final_clip, output_path, audio, ffmpeg_params, workers=RENDER_WORKERS,
+                          data=None, chunk_jobs=1, cache=True, audio_bitrate=AUDIO_BITRATE):
+    """Encode each timeline segment separately (reusing cached ones) and join them by stream copy.
+    
+    Every segment is encoded with the same codec parameters so the concat demuxer can append them
+    without re-encoding; the audio is muxed once over the joined video. With ``chunk_jobs`` > 1 the
+    segments still to encode are spread over that many processes, each rebuilding the timeline from
+    ``data``; segments that cannot be cached are split into smaller pieces to balance the chunks.
+    With ``cache='refresh'`` cached segments are encoded again and replaced instead of read.
+    """
+    os.makedirs(SEGMENT_CACHE_DIR, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix='segments-', dir=os.path.dirname(output_path) or '.')
+    if data is None or data.get('type') not in TIMELINE_BUILDERS:
+        chunk_jobs = 1
+    try:
+        segment_paths = []
+        encodes = []  # (start, num_frames, path, tmp_path)
+        queued = set()
+        hits = 0
+        piece_frames = int(np.ceil(final_clip.duration * FPS / max(chunk_jobs, 1)))
+        for i, (start, end, parts) in enumerate(final_clip.segments):
+            num_frames = int(round((end - start) * FPS))
+            if num_frames == 0:
+                continue
+            if parts is None or not cache:
+                # Every piece starts on a keyframe of its own file, so any frame boundary is a valid cut
+                for offset in range(0, num_frames, piece_frames):
+                    path = os.path.join(work_dir, f"segment_{i}_{offset}.mp4")
+                    encodes.append((start + offset / FPS, min(piece_frames, num_frames - offset), path, path))
+                    segment_paths.append(path)
+                continue
+            key = hashlib.sha1(repr((SEGMENT_CACHE_VERSION, RENDERER_VERSION, tuple(final_clip.size), FPS, num_frames,
+                                     ffmpeg_params, parts)).encode('utf-8')).hexdigest()
+            path = os.path.join(SEGMENT_CACHE_DIR, f"{key}.mp4")
+            segment_paths.append(path)
+            if cache != 'refresh' and os.path.exists(path):
+                os.utime(path)
+                hits += 1
+            elif path not in queued:
+                queued.add(path)
+                encodes.append((start, num_frames, path, os.path.join(SEGMENT_CACHE_DIR, f"{key}.{os.getpid()}.tmp.mp4")))
+        
+        if chunk_jobs > 1 and len(encodes) > 1:
+            totals = encode_chunks_in_parallel(data, final_clip.duration, encodes, ffmpeg_params, workers, chunk_jobs)
+        else:
+            totals = encode_segments(final_clip, encodes, ffmpeg_params, workers)
+        print(f"Segments: {len(segment_paths)} ({hits} from cache)")
+        if totals['frames']:
+            print_pipeline_stats(totals)
+        
+        list_path = os.path.join(work_dir, 'segments.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for path in segment_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        
+        audio_path = audio if isinstance(audio, str) else None
+        if audio is True and final_clip.audio is not None:
+            audio_path = os.path.join(work_dir, 'audio.m4a')
+            with tracer.span('mix layer audio', 'audio'):
+                final_clip.audio.write_audiofile(audio_path, fps=AUDIO_FPS, codec='aac', bitrate=audio_bitrate,
+                                                 logger=None)
+        
+        cmd = [ffmpeg_binary(), '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', list_path]
+        if audio_path:
+            cmd += ['-i', audio_path, '-map', '0:v', '-map', '1:a']
+        cmd += ['-c', 'copy', '-movflags', '+faststart', output_path]
+        with tracer.span('concat and mux', 'encode', segments=len(segment_paths)):
+            subprocess.run(cmd, check=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    trim_cache_dir(SEGMENT_CACHE_DIR, SEGMENT_CACHE_DISK_BYTES, '.mp4')
+
+def encode_segments(clip, encodes, ffmpeg_params, workers=RENDER_WORKERS):
+    """Encode (start, num_frames, path, tmp_path) ranges of a clip to their own files; returns summed pipeline stats."""
+    totals = {'frames': 0, 'seconds': 0.0, 'queue_depth': 0.0, 'encoder_starved': 0.0, 'compositor_blocked': 0.0}
+    for start, num_frames, path, tmp_path in encodes:
+        end = start + num_frames / FPS
         try:
-            logo_clip = ImageClip(data['logo']).resize(height=120).set_position((50, 50)).set_duration(total_duration)
-        except Exception as e:
-            print(f"Warning: Could not load logo - {e}")
+            with tracer.span('encode', 'encode', segment=f"{start:.2f}-{end:.2f}s", frames=num_frames):
+                stats = encode_clip(clip.subclip(start, end), tmp_path, ffmpeg_params, workers=workers,
+                                    num_frames=num_frames)
+        except BaseException:
+            # A partial file would never be evicted (trim_cache_dir skips temporaries), so drop it here
+            if tmp_path != path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if tmp_path != path:
+            os.replace(tmp_path, path)
+        stats['queue_depth'] *= stats['frames']
+        for name in totals:
+            totals[name] += stats[name]
+    totals['queue_depth'] /= max(totals['frames'], 1)
+    return totals
+
+def render_chunk(data, duration, encodes, ffmpeg_params, workers, trace_context=None):
+    """Worker process entry point: rebuild the entry's timeline and encode one chunk of its segments."""
+    tracer.context = dict(trace_context or {})
+    timeline = TIMELINE_BUILDERS[data['type']](data)
+    try:
+        with tracer.span('build compositor', 'layout'):
+            clip = timeline.to_clip()
+        if abs(clip.duration - duration) > 1e-6:
+            raise RuntimeError(f"Timeline rebuilt with duration {clip.duration}s instead of {duration}s")
+        return encode_segments(clip, encodes, ffmpeg_params, workers)
+    finally:
+        timeline.close()
+        tracer.flush()
+
+def encode_chunks_in_parallel(data, duration, encodes, ffmpeg_params, workers, chunk_jobs):
+    """Split the pending encodes into contiguous chunks of similar frame count and render each in its own process."""
+    total_frames = sum(num_frames for _, num_frames, _, _ in encodes)
+    chunks = [[]]
+    done = 0
+    for item in encodes:
+        if chunks[-1] and done >= total_frames * len(chunks) / chunk_jobs:
+            chunks.append([])
+        chunks[-1].append(item)
+        done += item[1]
+    
+    totals = {'frames': 0, 'queue_depth': 0.0, 'encoder_starved': 0.0, 'compositor_blocked': 0.0}
+    start = time.perf_counter()
+    # Each process gets its share of the compositor threads so the machine is not oversubscribed
+    chunk_workers = max(1, workers // len(chunks))
+    with ProcessPoolExecutor(max_workers=len(chunks), initializer=start_worker,
+                             initargs=(tracer.path if tracer.enabled else None, output_format())) as pool:
+        futures = [pool.submit(render_chunk, data, duration, chunk, ffmpeg_params, chunk_workers,
+                               dict(tracer.context, chunk=i))
+                   for i, chunk in enumerate(chunks)]
+        for future in futures:
+            stats = future.result()
+            stats['queue_depth'] *= stats['frames']
+            for name in totals:
+                totals[name] += stats[name]
+    totals['queue_depth'] /= max(totals['frames'], 1)
+    totals['seconds'] = time.perf_counter() - start
+    print(f"Chunks: {len(chunks)} processes")
+    return totals
+
+def render_timeline(timeline, data):
+    """Composite, encode and release a template's timeline."""
+    try:
+        with tracer.span('build compositor', 'layout'):
+            clip = timeline.to_clip()
+        write_video(clip, data)
+    finally:
+        timeline.close()
+
+# Video creation functions
+@tracer.traced(category='layout')
+def build_quiz_timeline(data):
+    """Lay out the quiz video."""
+    timer_duration = data.get('timer', 10)
+    answer_reveal_duration = 5
+    total_duration = INTRO_DURATION + timer_duration + answer_reveal_duration + OUTRO_DURATION
     
-    all_clips = []
+    if total_duration > 90:
+        total_duration = 90
+    
+    timeline = Timeline()
+    timeline.add(load_background(data['background'], total_duration))
     current_time = 0
     
-    shake_offsets = [(5, 3), (-3, -5), (4, 2), (-2, -3), (0, 0), (3, -2), (-4, 4), (2, -1)]
-    frame_duration = INTRO_DURATION / len(shake_offsets)
+    timeline.add(create_shake_text_clip("Movie Quiz Time!", data.get('font', 'Arial'),
+                                        data.get('font_color', 'white'), FONT_SIZE + 10, INTRO_DURATION, data.get('shake')),
+                 current_time, current_time + INTRO_DURATION)
+    current_time += INTRO_DURATION
     
-    for offset in shake_offsets:
-        intro_img = create_text_with_shadow("Movie Fun Fact!", data.get('font', 'Arial'),
-                                           data.get('font_color', 'white'), FONT_SIZE + 10, shake_offset=offset)
-        intro_overlay = ImageClip(intro_img).set_duration(frame_duration)
-        intro_bg = bg_clip.subclip(current_time, current_time + frame_duration)
-        
-        layers = [intro_bg, intro_overlay]
-        if logo_clip:
-            layers.append(logo_clip.subclip(current_time, current_time + frame_duration))
-        
-        all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
-        current_time += frame_duration
+    question_text = f"{data['question']}\n\n" + "\n".join(data['options'])
+    question_sprite = create_text_with_shadow(question_text, data.get('font', 'Arial'),
+                                              data.get('font_color', 'white'), FONT_SIZE - 5)
+    timeline.add(sprite_clip(question_sprite), current_time, current_time + timer_duration)
+    timeline.add(create_countdown_clip(timer_duration), current_time, current_time + timer_duration)
+    current_time += timer_duration
+    
+    answer_sprite = create_highlight_animation(f"Correct Answer:\n{data['correct_answer']}", 
+                                               data.get('font', 'Arial'), FONT_SIZE)
+    timeline.add(sprite_clip(answer_sprite), current_time, current_time + answer_reveal_duration)
+    current_time += answer_reveal_duration
     
-    fact_img = create_fact_text_with_header(data['fact'], data.get('font', 'Arial'),
-                                           data.get('font_color', 'white'), FONT_SIZE - 5)
-    fact_overlay = ImageClip(fact_img).set_duration(fact_duration)
-    fact_bg = bg_clip.subclip(current_time, current_time + fact_duration)
+    outro_end = min(current_time + INTRO_DURATION, total_duration)
+    timeline.add(create_shake_text_clip(OUTRO_TEXT_QUIZ, data.get('font', 'Arial'),
+                                        data.get('font_color', 'white'), FONT_SIZE, outro_end - current_time, data.get('shake')),
+                 current_time, outro_end)
     
-    layers = [fact_bg]
-    if 'poster' in data and os.path.exists(data['poster']):
-        poster = ImageClip(data['poster']).resize(height=700).set_position(('center', 150)).set_duration(fact_duration)
-        layers.append(poster)
-    layers.append(fact_overlay)
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, current_time + fact_duration))
+    add_logo(timeline, data)
+    return timeline
+
+def create_quiz_video(data):
+    """Generate quiz video."""
+    render_timeline(build_quiz_timeline(data), data)
+    print(f"Quiz video created: {data['output']}")
+
+@tracer.traced(category='layout')
+def build_fact_timeline(data):
+    """Lay out the fun fact video."""
+    fact_duration = 15
+    total_duration = INTRO_DURATION + fact_duration + OUTRO_DURATION
     
-    fact_composite = CompositeVideoClip(layers, size=RESOLUTION)
-    all_clips.append(fact_composite)
-    current_time += fact_duration
+    timeline = Timeline()
+    timeline.add(load_background(data['background'], total_duration))
+    current_time = 0
     
-    for offset in shake_offsets:
-        outro_img = create_text_with_shadow(OUTRO_TEXT_FACT, data.get('font', 'Arial'),
-                                           data.get('font_color', 'white'), FONT_SIZE, shake_offset=offset)
-        outro_overlay = ImageClip(outro_img).set_duration(frame_duration)
-        outro_bg = bg_clip.subclip(current_time, min(current_time + frame_duration, bg_clip.duration))
-        
-        layers = [outro_bg, outro_overlay]
-        if logo_clip:
-            layers.append(logo_clip.subclip(current_time, min(current_time + frame_duration, bg_clip.duration)))
-        
-        all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
-        current_time += frame_duration
+    timeline.add(create_shake_text_clip("Movie Fun Fact!", data.get('font', 'Arial'),
+                                        data.get('font_color', 'white'), FONT_SIZE + 10, INTRO_DURATION, data.get('shake')),
+                 current_time, current_time + INTRO_DURATION)
+    current_time += INTRO_DURATION
     
-    final_clip = concatenate_videoclips(all_clips, method="compose")
+    if 'poster' in data and os.path.exists(data['poster']):
+        poster = image_clip(data['poster'], height=px(700)).set_position(('center', px(150)))
+        timeline.add(poster, current_time, current_time + fact_duration)
+    fact_sprite = create_fact_text_with_header(data['fact'], data.get('font', 'Arial'),
+                                               data.get('font_color', 'white'), FONT_SIZE - 5)
+    timeline.add(sprite_clip(fact_sprite), current_time, current_time + fact_duration)
+    current_time += fact_duration
     
-    if 'audio' in data and os.path.exists(data['audio']):
-        try:
-            audio = AudioFileClip(data['audio'])
-            if audio.duration < final_clip.duration:
-                num_loops = int(final_clip.duration / audio.duration) + 1
-                looped_audio = concatenate_videoclips([AudioFileClip(data['audio']).set_duration(audio.duration) for _ in range(num_loops)])
-                looped_audio = looped_audio.subclip(0, final_clip.duration)
-                final_clip = final_clip.set_audio(looped_audio)
-            else:
-                final_clip = final_clip.set_audio(audio.subclip(0, final_clip.duration))
-        except Exception as e:
-            print(f"Warning: Could not add audio - {e}")
+    outro_end = min(current_time + INTRO_DURATION, total_duration)
+    timeline.add(create_shake_text_clip(OUTRO_TEXT_FACT, data.get('font', 'Arial'),
+                                        data.get('font_color', 'white'), FONT_SIZE, outro_end - current_time, data.get('shake')),
+                 current_time, outro_end)
     
-    os.makedirs(os.path.dirname(data['output']), exist_ok=True)
-    final_clip.write_videofile(data['output'], codec='libx264', fps=FPS, audio_codec='aac', threads=4)
-    final_clip.close()
-    bg_clip.close()
-    if logo_clip:
-        logo_clip.close()
+    add_logo(timeline, data)
+    return timeline
+
+def create_fact_video(data):
+    """Generate fun fact video."""
+    render_timeline(build_fact_timeline(data), data)
     print(f"Fun fact video created: {data['output']}")
 
-def create_emoji_guess_video(data):
-    """Generate emoji guessing video."""
+@tracer.traced(category='layout')
+def build_emoji_guess_timeline(data):
+    """Lay out the emoji guessing video."""
     countdown_duration = 3
     reveal_duration = 5
     total_duration = 5 + 7 + countdown_duration + reveal_duration + OUTRO_DURATION
     
-    bg_clip = load_background(data['background'], total_duration)
-    
-    logo_clip = None
-    if 'logo' in data and os.path.exists(data['logo']):
-        try:
-            logo_clip = ImageClip(data['logo']).resize(height=120).set_position((50, 50)).set_duration(total_duration)
-        except Exception as e:
-            print(f"Warning: Could not load logo - {e}")
-    
-    all_clips = []
+    timeline = Timeline()
+    timeline.add(load_background(data['background'], total_duration))
     current_time = 0
     
-    intro_img = create_text_with_shadow("Can you guess the movie?", data.get('font', 'Arial'),
-                                       data.get('font_color', 'white'), FONT_SIZE + 10)
-    intro_overlay = ImageClip(intro_img).set_duration(5)
-    intro_bg = bg_clip.subclip(current_time, current_time + 5)
-    layers = [intro_bg, intro_overlay]
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, current_time + 5))
-    all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
+    intro_sprite = create_text_with_shadow("Can you guess the movie?", data.get('font', 'Arial'),
+                                           data.get('font_color', 'white'), FONT_SIZE + 10)
+    timeline.add(sprite_clip(intro_sprite), current_time, current_time + 5)
     current_time += 5
     
+    # The emojis stay on screen through the countdown
     emoji_text = " ".join(data['emojis'])
-    emoji_img = create_text_with_shadow(emoji_text, data.get('font', 'Arial'),
-                                       data.get('font_color', 'white'), 120)
-    emoji_overlay = ImageClip(emoji_img).set_duration(7)
-    emoji_bg = bg_clip.subclip(current_time, current_time + 7)
-    layers = [emoji_bg, emoji_overlay]
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, current_time + 7))
-    all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
+    emoji_sprite = create_text_with_shadow(emoji_text, data.get('font', 'Arial'),
+                                           data.get('font_color', 'white'), 120)
+    timeline.add(sprite_clip(emoji_sprite), current_time, current_time + 7 + countdown_duration)
     current_time += 7
     
-    for t in range(countdown_duration, 0, -1):
-        timer_img = create_circular_timer(t)
-        timer_overlay = ImageClip(timer_img).set_duration(1)
-        countdown_bg = bg_clip.subclip(current_time, current_time + 1)
-        layers = [countdown_bg, emoji_overlay, timer_overlay]
-        if logo_clip:
-            layers.append(logo_clip.subclip(current_time, current_time + 1))
-        all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
-        current_time += 1
+    timeline.add(create_countdown_clip(countdown_duration), current_time, current_time + countdown_duration)
+    current_time += countdown_duration
     
     reveal_text = f"{data['movie_title']}\n\n{data.get('fun_fact', '')}"
-    reveal_img = create_text_with_shadow(reveal_text, data.get('font', 'Arial'),
-                                        data.get('font_color', 'white'), FONT_SIZE)
-    reveal_overlay = ImageClip(reveal_img).set_duration(reveal_duration)
-    reveal_bg = bg_clip.subclip(current_time, current_time + reveal_duration)
-    
-    layers = [reveal_bg]
     if 'poster' in data and os.path.exists(data['poster']):
-        poster = ImageClip(data['poster']).resize(height=800).set_position(('center', 100)).set_duration(reveal_duration)
-        layers.append(poster)
-        reveal_overlay = ImageClip(create_text_with_shadow(reveal_text, data.get('font', 'Arial'),
-                                   data.get('font_color', 'white'), FONT_SIZE - 10)).set_duration(reveal_duration).set_position(('center', 1000))
-    layers.append(reveal_overlay)
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, current_time + reveal_duration))
-    all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
+        poster = image_clip(data['poster'], height=px(800)).set_position(('center', px(100)))
+        timeline.add(poster, current_time, current_time + reveal_duration)
+        reveal_overlay = sprite_clip(create_text_with_shadow(reveal_text, data.get('font', 'Arial'),
+                                     data.get('font_color', 'white'), FONT_SIZE - 10)).set_position(('center', px(1000)))
+    else:
+        reveal_overlay = sprite_clip(create_text_with_shadow(reveal_text, data.get('font', 'Arial'),
+                                                             data.get('font_color', 'white'), FONT_SIZE))
+    timeline.add(reveal_overlay, current_time, current_time + reveal_duration)
     current_time += reveal_duration
     
-    outro_img = create_text_with_shadow(OUTRO_TEXT_EMOJI, data.get('font', 'Arial'),
-                                       data.get('font_color', 'white'), FONT_SIZE)
-    outro_overlay = ImageClip(outro_img).set_duration(OUTRO_DURATION)
-    outro_bg = bg_clip.subclip(current_time, min(current_time + OUTRO_DURATION, bg_clip.duration))
-    layers = [outro_bg, outro_overlay]
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, min(current_time + OUTRO_DURATION, bg_clip.duration)))
-    all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
-    
-    final_clip = concatenate_videoclips(all_clips, method="compose")
-    
-    if 'audio' in data and os.path.exists(data['audio']):
-        try:
-            audio = AudioFileClip(data['audio'])
-            if audio.duration < final_clip.duration:
-                num_loops = int(final_clip.duration / audio.duration) + 1
-                looped_audio = concatenate_videoclips([AudioFileClip(data['audio']).set_duration(audio.duration) for _ in range(num_loops)])
-                looped_audio = looped_audio.subclip(0, final_clip.duration)
-                final_clip = final_clip.set_audio(looped_audio)
-            else:
-                final_clip = final_clip.set_audio(audio.subclip(0, final_clip.duration))
-        except Exception as e:
-            print(f"Warning: Could not add audio - {e}")
+    outro_sprite = create_text_with_shadow(OUTRO_TEXT_EMOJI, data.get('font', 'Arial'),
+                                           data.get('font_color', 'white'), FONT_SIZE)
+    timeline.add(sprite_clip(outro_sprite), current_time, current_time + OUTRO_DURATION)
     
-    os.makedirs(os.path.dirname(data['output']), exist_ok=True)
-    final_clip.write_videofile(data['output'], codec='libx264', fps=FPS, audio_codec='aac', threads=4)
-    final_clip.close()
-    bg_clip.close()
-    if logo_clip:
-        logo_clip.close()
+    add_logo(timeline, data)
+    return timeline
+
+def create_emoji_guess_video(data):
+    """Generate emoji guessing video."""
+    render_timeline(build_emoji_guess_timeline(data), data)
     print(f"Emoji guess video created: {data['output']}")
 
-def create_character_reveal_video(data):
-    """Generate character guessing video with zoom/blur reveal."""
+@tracer.traced(category='layout')
+def build_character_reveal_timeline(data):
+    """Lay out the character guessing video with zoom/blur reveal."""
     hint_duration = 5
     countdown_duration = 3
     reveal_duration = 5
     total_duration = 5 + hint_duration + countdown_duration + reveal_duration + OUTRO_DURATION
     
-    bg_clip = load_background(data['background'], total_duration)
-    
-    logo_clip = None
-    if 'logo' in data and os.path.exists(data['logo']):
-        try:
-            logo_clip = ImageClip(data['logo']).resize(height=120).set_position((50, 50)).set_duration(total_duration)
-        except Exception as e:
-            print(f"Warning: Could not load logo - {e}")
-    
-    all_clips = []
+    timeline = Timeline()
+    timeline.add(load_background(data['background'], total_duration))
     current_time = 0
     
-    intro_img = create_text_with_shadow("WHO IS THIS MOVIE CHARACTER?", data.get('font', 'Arial'),
-                                       data.get('font_color', 'white'), FONT_SIZE + 5)
-    intro_overlay = ImageClip(intro_img).set_duration(5)
-    intro_bg = bg_clip.subclip(current_time, current_time + 5)
+    # The character sharpens continuously from the intro until the reveal
+    blur_end = 5 + hint_duration + countdown_duration
+    blur_keyframes = [(0, 40), (5, 30), (5 + hint_duration, 20), (blur_end, 6)]
+    timeline.add(create_blur_reveal_clip(data['character_image'], blur_keyframes), current_time, current_time + blur_end)
     
-    blurred_char = ImageClip(apply_blur_to_image(data['character_image'], blur_radius=40)).set_duration(5)
-    layers = [intro_bg, blurred_char, intro_overlay]
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, current_time + 5))
-    all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
+    intro_sprite = create_text_with_shadow("WHO IS THIS MOVIE CHARACTER?", data.get('font', 'Arial'),
+                                           data.get('font_color', 'white'), FONT_SIZE + 5)
+    timeline.add(sprite_clip(intro_sprite), current_time, current_time + 5)
     current_time += 5
     
-    hint_img = create_text_with_shadow(f"Hint: {data['hint']}", data.get('font', 'Arial'),
-                                      data.get('font_color', 'yellow'), FONT_SIZE)
-    hint_overlay = ImageClip(hint_img).set_duration(hint_duration)
-    hint_bg = bg_clip.subclip(current_time, current_time + hint_duration)
-    blurred_char2 = ImageClip(apply_blur_to_image(data['character_image'], blur_radius=30)).set_duration(hint_duration)
-    layers = [hint_bg, blurred_char2, hint_overlay]
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, current_time + hint_duration))
-    all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
+    hint_sprite = create_text_with_shadow(f"Hint: {data['hint']}", data.get('font', 'Arial'),
+                                          data.get('font_color', 'yellow'), FONT_SIZE)
+    timeline.add(sprite_clip(hint_sprite), current_time, current_time + hint_duration)
     current_time += hint_duration
     
-    for t in range(countdown_duration, 0, -1):
-        timer_img = create_circular_timer(t)
-        timer_overlay = ImageClip(timer_img).set_duration(1)
-        countdown_bg = bg_clip.subclip(current_time, current_time + 1)
-        blurred_char3 = ImageClip(apply_blur_to_image(data['character_image'], blur_radius=20)).set_duration(1)
-        layers = [countdown_bg, blurred_char3, timer_overlay]
-        if logo_clip:
-            layers.append(logo_clip.subclip(current_time, current_time + 1))
-        all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
-        current_time += 1
-    
-    reveal_img = create_text_with_shadow(f"{data['character_name']}\nfrom {data['movie_title']}", 
-                                        data.get('font', 'Arial'),
-                                        data.get('font_color', 'white'), FONT_SIZE)
-    reveal_overlay = ImageClip(reveal_img).set_duration(reveal_duration).set_position(('center', 1400))
-    reveal_bg = bg_clip.subclip(current_time, current_time + reveal_duration)
-    clear_char = ImageClip(data['character_image']).resize(height=1200).set_position(('center', 100)).set_duration(reveal_duration)
-    layers = [reveal_bg, clear_char, reveal_overlay]
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, current_time + reveal_duration))
-    all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
-    current_time += reveal_duration
+    timeline.add(create_countdown_clip(countdown_duration), current_time, current_time + countdown_duration)
+    current_time += countdown_duration
     
-    outro_img = create_text_with_shadow(OUTRO_TEXT_CHARACTER, data.get('font', 'Arial'),
-                                       data.get('font_color', 'white'), FONT_SIZE)
-    outro_overlay = ImageClip(outro_img).set_duration(OUTRO_DURATION)
-    outro_bg = bg_clip.subclip(current_time, min(current_time + OUTRO_DURATION, bg_clip.duration))
-    layers = [outro_bg, outro_overlay]
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, min(current_time + OUTRO_DURATION, bg_clip.duration)))
-    all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
-    
-    final_clip = concatenate_videoclips(all_clips, method="compose")
+    reveal_sprite = create_text_with_shadow(f"{data['character_name']}\nfrom {data['movie_title']}", 
+                                            data.get('font', 'Arial'),
+                                            data.get('font_color', 'white'), FONT_SIZE)
+    clear_char = image_clip(data['character_image'], height=px(1200)).set_position(('center', px(100)))
+    timeline.add(clear_char, current_time, current_time + reveal_duration)
+    timeline.add(sprite_clip(reveal_sprite).set_position(('center', px(1400))), current_time, current_time + reveal_duration)
+    current_time += reveal_duration
     
-    if 'audio' in data and os.path.exists(data['audio']):
-        try:
-            audio = AudioFileClip(data['audio'])
-            if audio.duration < final_clip.duration:
-                num_loops = int(final_clip.duration / audio.duration) + 1
-                looped_audio = concatenate_videoclips([AudioFileClip(data['audio']).set_duration(audio.duration) for _ in range(num_loops)])
-                looped_audio = looped_audio.subclip(0, final_clip.duration)
-                final_clip = final_clip.set_audio(looped_audio)
-            else:
-                final_clip = final_clip.set_audio(audio.subclip(0, final_clip.duration))
-        except Exception as e:
-            print(f"Warning: Could not add audio - {e}")
+    outro_sprite = create_text_with_shadow(OUTRO_TEXT_CHARACTER, data.get('font', 'Arial'),
+                                           data.get('font_color', 'white'), FONT_SIZE)
+    timeline.add(sprite_clip(outro_sprite), current_time, current_time + OUTRO_DURATION)
     
-    os.makedirs(os.path.dirname(data['output']), exist_ok=True)
-    final_clip.write_videofile(data['output'], codec='libx264', fps=FPS, audio_codec='aac', threads=4)
-    final_clip.close()
-    bg_clip.close()
-    if logo_clip:
-        logo_clip.close()
+    add_logo(timeline, data)
+    return timeline
+
+def create_character_reveal_video(data):
+    """Generate character guessing video with zoom/blur reveal."""
+    render_timeline(build_character_reveal_timeline(data), data)
     print(f"Character reveal video created: {data['output']}")
 
-def create_minimalist_challenge_video(data):
-    """Generate minimalist poster challenge video."""
+@tracer.traced(category='layout')
+def build_minimalist_challenge_timeline(data):
+    """Lay out the minimalist poster challenge video."""
     display_duration = 6
     reveal_duration = 4
     total_duration = display_duration + reveal_duration + OUTRO_DURATION
     
-    bg_clip = load_background(data['background'], total_duration)
-    
-    logo_clip = None
-    if 'logo' in data and os.path.exists(data['logo']):
-        try:
-            logo_clip = ImageClip(data['logo']).resize(height=120).set_position((50, 50)).set_duration(total_duration)
-        except Exception as e:
-            print(f"Warning: Could not load logo - {e}")
-    
-    all_clips = []
+    timeline = Timeline()
+    timeline.add(load_background(data['background'], total_duration))
     current_time = 0
     
-    guess_img = create_text_with_shadow("GUESS THE MOVIE", data.get('font', 'Arial'),
-                                       data.get('font_color', 'white'), FONT_SIZE + 10)
-    guess_overlay = ImageClip(guess_img).set_duration(display_duration).set_position(('center', 200))
-    display_bg = bg_clip.subclip(current_time, current_time + display_duration)
-    minimalist = ImageClip(data['minimalist_icon']).resize(height=800).set_position(('center', 600)).set_duration(display_duration)
-    layers = [display_bg, minimalist, guess_overlay]
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, current_time + display_duration))
-    all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
+    guess_sprite = create_text_with_shadow("GUESS THE MOVIE", data.get('font', 'Arial'),
+                                           data.get('font_color', 'white'), FONT_SIZE + 10)
+    minimalist = image_clip(data['minimalist_icon'], height=px(800)).set_position(('center', px(600)))
+    timeline.add(minimalist, current_time, current_time + display_duration)
+    timeline.add(sprite_clip(guess_sprite).set_position(('center', px(200))), current_time, current_time + display_duration)
     current_time += display_duration
     
-    reveal_bg = bg_clip.subclip(current_time, current_time + reveal_duration)
-    poster = ImageClip(data['movie_poster']).resize(height=1500).set_position(('center', 200)).set_duration(reveal_duration)
-    layers = [reveal_bg, poster]
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, current_time + reveal_duration))
-    all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
+    poster = image_clip(data['movie_poster'], height=px(1500)).set_position(('center', px(200)))
+    timeline.add(poster, current_time, current_time + reveal_duration)
     current_time += reveal_duration
     
-    outro_img = create_text_with_shadow(OUTRO_TEXT_MINIMALIST, data.get('font', 'Arial'),
-                                       data.get('font_color', 'white'), FONT_SIZE)
-    outro_overlay = ImageClip(outro_img).set_duration(OUTRO_DURATION)
-    outro_bg = bg_clip.subclip(current_time, min(current_time + OUTRO_DURATION, bg_clip.duration))
-    layers = [outro_bg, outro_overlay]
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, min(current_time + OUTRO_DURATION, bg_clip.duration)))
-    all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
-    
-    final_clip = concatenate_videoclips(all_clips, method="compose")
-    
-    if 'audio' in data and os.path.exists(data['audio']):
-        try:
-            audio = AudioFileClip(data['audio'])
-            if audio.duration < final_clip.duration:
-                num_loops = int(final_clip.duration / audio.duration) + 1
-                looped_audio = concatenate_videoclips([AudioFileClip(data['audio']).set_duration(audio.duration) for _ in range(num_loops)])
-                looped_audio = looped_audio.subclip(0, final_clip.duration)
-                final_clip = final_clip.set_audio(looped_audio)
-            else:
-                final_clip = final_clip.set_audio(audio.subclip(0, final_clip.duration))
-        except Exception as e:
-            print(f"Warning: Could not add audio - {e}")
+    outro_sprite = create_text_with_shadow(OUTRO_TEXT_MINIMALIST, data.get('font', 'Arial'),
+                                           data.get('font_color', 'white'), FONT_SIZE)
+    timeline.add(sprite_clip(outro_sprite), current_time, current_time + OUTRO_DURATION)
     
-    os.makedirs(os.path.dirname(data['output']), exist_ok=True)
-    final_clip.write_videofile(data['output'], codec='libx264', fps=FPS, audio_codec='aac', threads=4)
-    final_clip.close()
-    bg_clip.close()
-    if logo_clip:
-        logo_clip.close()
+    add_logo(timeline, data)
+    return timeline
+
+def create_minimalist_challenge_video(data):
+    """Generate minimalist poster challenge video."""
+    render_timeline(build_minimalist_challenge_timeline(data), data)
     print(f"Minimalist challenge video created: {data['output']}")
 
-def create_then_now_video(data):
-    """Generate then & now comparison video."""
+@tracer.traced(category='layout')
+def build_then_now_timeline(data):
+    """Lay out the then & now comparison video."""
     then_duration = 5
     now_duration = 5
     total_duration = (then_duration + now_duration) * len(data['comparisons']) + OUTRO_DURATION
     
-    bg_clip = load_background(data['background'], total_duration)
-    
-    logo_clip = None
-    if 'logo' in data and os.path.exists(data['logo']):
-        try:
-            logo_clip = ImageClip(data['logo']).resize(height=120).set_position((50, 50)).set_duration(total_duration)
-        except Exception as e:
-            print(f"Warning: Could not load logo - {e}")
-    
-    all_clips = []
+    timeline = Timeline()
+    timeline.add(load_background(data['background'], total_duration))
     current_time = 0
     
     for comparison in data['comparisons']:
-        then_img = create_text_with_shadow(f"THEN ({comparison['then_year']})\n{comparison['name']}", 
-                                          data.get('font', 'Arial'),
-                                          data.get('font_color', 'white'), FONT_SIZE)
-        then_overlay = ImageClip(then_img).set_duration(then_duration).set_position(('center', 1500))
-        then_bg = bg_clip.subclip(current_time, current_time + then_duration)
-        then_photo = ImageClip(comparison['then_image']).resize(height=1200).set_position(('center', 100)).set_duration(then_duration)
-        layers = [then_bg, then_photo, then_overlay]
-        if logo_clip:
-            layers.append(logo_clip.subclip(current_time, current_time + then_duration))
-        all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
+        then_sprite = create_text_with_shadow(f"THEN ({comparison['then_year']})\n{comparison['name']}", 
+                                              data.get('font', 'Arial'),
+                                              data.get('font_color', 'white'), FONT_SIZE)
+        then_photo = image_clip(comparison['then_image'], height=px(1200)).set_position(('center', px(100)))
+        timeline.add(then_photo, current_time, current_time + then_duration)
+        timeline.add(sprite_clip(then_sprite).set_position(('center', px(1500))), current_time, current_time + then_duration)
         current_time += then_duration
         
-        now_img = create_text_with_shadow(f"NOW ({comparison['now_year']})\n{comparison['name']}", 
-                                         data.get('font', 'Arial'),
-                                         data.get('font_color', 'white'), FONT_SIZE)
-        now_overlay = ImageClip(now_img).set_duration(now_duration).set_position(('center', 1500))
-        now_bg = bg_clip.subclip(current_time, current_time + now_duration)
-        now_photo = ImageClip(comparison['now_image']).resize(height=1200).set_position(('center', 100)).set_duration(now_duration)
-        layers = [now_bg, now_photo, now_overlay]
-        if logo_clip:
-            layers.append(logo_clip.subclip(current_time, current_time + now_duration))
-        all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
+        now_sprite = create_text_with_shadow(f"NOW ({comparison['now_year']})\n{comparison['name']}", 
+                                             data.get('font', 'Arial'),
+                                             data.get('font_color', 'white'), FONT_SIZE)
+        now_photo = image_clip(comparison['now_image'], height=px(1200)).set_position(('center', px(100)))
+        timeline.add(now_photo, current_time, current_time + now_duration)
+        timeline.add(sprite_clip(now_sprite).set_position(('center', px(1500))), current_time, current_time + now_duration)
         current_time += now_duration
     
-    outro_img = create_text_with_shadow(OUTRO_TEXT_THEN_NOW, data.get('font', 'Arial'),
-                                       data.get('font_color', 'white'), FONT_SIZE)
-    outro_overlay = ImageClip(outro_img).set_duration(OUTRO_DURATION)
-    outro_bg = bg_clip.subclip(current_time, min(current_time + OUTRO_DURATION, bg_clip.duration))
-    layers = [outro_bg, outro_overlay]
-    if logo_clip:
-        layers.append(logo_clip.subclip(current_time, min(current_time + OUTRO_DURATION, bg_clip.duration)))
-    all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
-    
-    final_clip = concatenate_videoclips(all_clips, method="compose")
-    
-    if 'audio' in data and os.path.exists(data['audio']):
-        try:
-            audio = AudioFileClip(data['audio'])
-            if audio.duration < final_clip.duration:
-                num_loops = int(final_clip.duration / audio.duration) + 1
-                looped_audio = concatenate_videoclips([AudioFileClip(data['audio']).set_duration(audio.duration) for _ in range(num_loops)])
-                looped_audio = looped_audio.subclip(0, final_clip.duration)
-                final_clip = final_clip.set_audio(looped_audio)
-            else:
-                final_clip = final_clip.set_audio(audio.subclip(0, final_clip.duration))
-        except Exception as e:
-            print(f"Warning: Could not add audio - {e}")
+    outro_sprite = create_text_with_shadow(OUTRO_TEXT_THEN_NOW, data.get('font', 'Arial'),
+                                           data.get('font_color', 'white'), FONT_SIZE)
+    timeline.add(sprite_clip(outro_sprite), current_time, current_time + OUTRO_DURATION)
     
-    os.makedirs(os.path.dirname(data['output']), exist_ok=True)
-    final_clip.write_videofile(data['output'], codec='libx264', fps=FPS, audio_codec='aac', threads=4)
-    final_clip.close()
-    bg_clip.close()
-    if logo_clip:
-        logo_clip.close()
+    add_logo(timeline, data)
+    return timeline
+
+def create_then_now_video(data):
+    """Generate then & now comparison video."""
+    render_timeline(build_then_now_timeline(data), data)
     print(f"Then & Now video created: {data['output']}")
 
 # def create_opinion_video(data):
@@ -872,114 +2116,692 @@ def create_then_now_video(data):
 
 
 
-def create_opinion_video(data):
-    """Generate unpopular opinion video."""
+@tracer.traced(category='layout')
+def build_opinion_timeline(data):
+    """Lay out the unpopular opinion video."""
     opinion_duration = 5
     total_duration = len(data['opinions']) * opinion_duration + OUTRO_DURATION
     
-    bg_clip = load_background(data['background'], total_duration)
-    logo_clip = None
-    try:
-        if 'logo' in data and os.path.exists(data['logo']):
-            logo_clip = ImageClip(data['logo']).resize(height=120).set_position((50, 50)).set_duration(total_duration)
-        
-        all_clips = []
-        current_time = 0
-        
-        for opinion in data['opinions']:
-            opinion_text = f"Unpopular Opinion:\n\n{opinion}"
-            opinion_img = create_text_with_shadow(opinion_text, data.get('font', 'Arial'),
+    timeline = Timeline()
+    timeline.add(load_background(data['background'], total_duration))
+    current_time = 0
+    
+    for opinion in data['opinions']:
+        opinion_text = f"Unpopular Opinion:\n\n{opinion}"
+        opinion_sprite = create_text_with_shadow(opinion_text, data.get('font', 'Arial'),
                                                  data.get('font_color', 'white'), FONT_SIZE - 5)
-            opinion_overlay = ImageClip(opinion_img).set_duration(opinion_duration)
-            opinion_bg = bg_clip.subclip(current_time, current_time + opinion_duration)
-            layers = [opinion_bg, opinion_overlay]
-            if logo_clip:
-                layers.append(logo_clip.subclip(current_time, current_time + opinion_duration))
-            all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
-            current_time += opinion_duration
-        
-        outro_img = create_text_with_shadow(f"{OUTRO_TEXT_OPINION}\n\nTELL US YOUR HOT TAKES!", 
+        timeline.add(sprite_clip(opinion_sprite), current_time, current_time + opinion_duration)
+        current_time += opinion_duration
+    
+    outro_sprite = create_text_with_shadow(f"{OUTRO_TEXT_OPINION}\n\nTELL US YOUR HOT TAKES!", 
                                            data.get('font', 'Arial'),
                                            data.get('font_color', 'white'), FONT_SIZE)
-        outro_overlay = ImageClip(outro_img).set_duration(OUTRO_DURATION)
-        outro_bg = bg_clip.subclip(current_time, min(current_time + OUTRO_DURATION, bg_clip.duration))
-        layers = [outro_bg, outro_overlay]
-        if logo_clip:
-            layers.append(logo_clip.subclip(current_time, min(current_time + OUTRO_DURATION, bg_clip.duration)))
-        all_clips.append(CompositeVideoClip(layers, size=RESOLUTION))
+    timeline.add(sprite_clip(outro_sprite), current_time, current_time + OUTRO_DURATION)
+    
+    add_logo(timeline, data)
+    return timeline
+
+def create_opinion_video(data):
+    """Generate unpopular opinion video."""
+    render_timeline(build_opinion_timeline(data), data)
+    print(f"Opinion video created: {data['output']}")
+
+# Process input and GUI functions
+TIMELINE_BUILDERS = {
+    'quiz': build_quiz_timeline,
+    'fact': build_fact_timeline,
+    'emoji_guess': build_emoji_guess_timeline,
+    'character_reveal': build_character_reveal_timeline,
+    'minimalist_challenge': build_minimalist_challenge_timeline,
+    'then_now': build_then_now_timeline,
+    'opinion': build_opinion_timeline,
+}
+
+VIDEO_CREATORS = {
+    'quiz': create_quiz_video,
+    'fact': create_fact_video,
+    'emoji_guess': create_emoji_guess_video,
+    'character_reveal': create_character_reveal_video,
+    'minimalist_challenge': create_minimalist_challenge_video,
+    'then_now': create_then_now_video,
+    'opinion': create_opinion_video,
+}
+
+def render_job(idx, data, chunk_jobs=CHUNK_JOBS, force=False):
+    """Render a single input entry, returning (idx, output, error) instead of raising.
+    
+    With ``force`` nothing is reused from the segment cache: its segments are encoded again.
+    """
+    if chunk_jobs > 1 and 'chunk_jobs' not in data:
+        data = dict(data, chunk_jobs=chunk_jobs)
+    if force and data.get('segment_cache', SEGMENT_CACHE_ENABLED):
+        data = dict(data, segment_cache='refresh')
+    video_type = data.get('type')
+    creator = VIDEO_CREATORS.get(video_type) if isinstance(video_type, str) else None
+    if creator is None:
+        return idx, data.get('output'), f"Unknown video type: {video_type}"
+    tracer.context = {'job': idx, 'template': video_type}
+    try:
+        with tracer.span('job', 'job', output=data.get('output')):
+            creator(data)
+    except Exception as e:
+        return idx, data.get('output'), f"{type(e).__name__}: {e}"
+    finally:
+        tracer.context = {}
+        tracer.flush()
+    return idx, data.get('output'), None
+
+def iter_assets(data):
+    """Yield every asset path referenced by an input entry (including nested comparisons)."""
+    for key in ASSET_KEYS:
+        if isinstance(data.get(key), str):
+            yield data[key]
+    for comparison in comparison_entries(data):
+        yield from iter_assets(comparison)
+
+def comparison_entries(data):
+    """The well-formed entries of data['comparisons'] (validate_entry reports the rest)."""
+    comparisons = data.get('comparisons', [])
+    return [comparison for comparison in comparisons if isinstance(comparison, dict)] if isinstance(comparisons, list) else []
+
+def job_hash(data):
+    """Hash of the normalised entry, the contents of its assets and fonts, and RENDERER_VERSION."""
+    assets = {}
+    for path in iter_assets(data):
+        assets[path] = file_digest(path) if os.path.isfile(path) else None
+    fonts = [resolve_font(name) for name in [data.get('font', 'Arial'), *BOLD_FONT_FALLBACKS, *REGULAR_FONT_FALLBACKS]]
+    fonts = {path: file_digest(path) for path in fonts if path}
+    payload = json.dumps({'renderer': RENDERER_VERSION, 'format': [RESOLUTION, FPS, encoding_settings(data)], 'entry': data,
+                          'assets': assets, 'fonts': fonts},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def manifest_path(output):
+    return os.path.join(os.path.dirname(output) or '.', BUILD_MANIFEST_NAME)
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(path, manifest):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def is_up_to_date(data, digest, manifests):
+    output = data.get('output')
+    if not output or not os.path.exists(output):
+        return False
+    path = manifest_path(output)
+    if path not in manifests:
+        manifests[path] = load_manifest(path)
+    return manifests[path].get(os.path.basename(output), {}).get('hash') == digest
+
+_manifest_lock = threading.Lock()
+
+def record_build(data, digest, manifests):
+    """Record a finished output, merged into the manifest as it is on disk now: other runs (a CLI batch
+    beside the daemon, say) may have recorded outputs in the same folder since it was read."""
+    output = data['output']
+    path = manifest_path(output)
+    with _manifest_lock:
+        manifest = load_manifest(path)
+        manifest[os.path.basename(output)] = {'hash': digest, 'renderer': RENDERER_VERSION}
+        save_manifest(path, manifest)
+        manifests[path] = manifest
+
+REQUIRED_FIELDS = {
+    'quiz': ('question', 'options', 'correct_answer'),
+    'fact': ('fact',),
+    'emoji_guess': ('emojis', 'movie_title'),
+    'character_reveal': ('character_image', 'hint', 'character_name', 'movie_title'),
+    'minimalist_challenge': ('minimalist_icon', 'movie_poster'),
+    'then_now': ('comparisons',),
+    'opinion': ('opinions',),
+}
+COMPARISON_FIELDS = ('name', 'then_year', 'now_year', 'then_image', 'now_image')
+REQUIRED_ASSETS = ('background', 'character_image', 'minimalist_icon', 'movie_poster', 'then_image', 'now_image')
+
+def suggest_path(path):
+    """' (did you mean ...?)' for a missing file with a similarly named sibling, else ''."""
+    folder, name = os.path.split(path)
+    try:
+        siblings = os.listdir(folder or '.')
+    except OSError:
+        return ''
+    matches = difflib.get_close_matches(name, siblings, n=1, cutoff=0.8)
+    return f" (did you mean {os.path.join(folder, matches[0])}?)" if matches else ''
+
+def probe_problem(key, path, info):
+    """Why the probed media at ``path`` can't serve as ``key``, or None."""
+    if isinstance(info, str):
+        return f"unreadable: {path} ({info})"
+    if key == 'audio':
+        return None if info['audio_fps'] else f"has no audio stream: {path}"
+    return None if info['size'] else f"has no picture: {path}"
+
+def validate_entry(data, probes=None):
+    """Return (problems, warnings) for an input entry: problems stop it from rendering, warnings only drop an extra.
+    
+    With ``probes`` (path -> media info or error message) assets are also checked for being readable media.
+    """
+    video_type = data.get('type')
+    if not isinstance(video_type, str) or video_type not in VIDEO_CREATORS:
+        return [f"unknown video type {video_type!r}"], []
+    problems = [f"missing '{field}'" for field in ('output', 'background') + REQUIRED_FIELDS[video_type]
+                if field not in data]
+    warnings = []
+    if 'output' in data and not isinstance(data['output'], str):
+        problems.append(f"'output' must be a file path, not {data['output']!r}")
+    problems += encoding_problems(data.get('encoding', ENCODING_PROFILE))
+    if data.get('shake') not in (None,) + SHAKE_STYLES:
+        problems.append(f"unknown shake {data['shake']!r} (choose from {', '.join(SHAKE_STYLES)})")
+    comparisons = data.get('comparisons', [])
+    if not isinstance(comparisons, list):
+        problems.append(f"'comparisons' must be a list of objects, not {type(comparisons).__name__}")
+        comparisons = []
+    problems += [f"comparison {i}: must be an object, not {comparison!r}"
+                 for i, comparison in enumerate(comparisons, 1) if not isinstance(comparison, dict)]
+    entries = [('', data)] + [(f"comparison {i}: ", comparison) for i, comparison in enumerate(comparisons, 1)
+                              if isinstance(comparison, dict)]
+    for prefix, entry in entries:
+        if entry is not data:
+            problems += [f"{prefix}missing '{field}'" for field in COMPARISON_FIELDS if field not in entry]
+        for key in ASSET_KEYS:
+            path = entry.get(key)
+            if not isinstance(path, str):
+                if path is not None:
+                    problems.append(f"{prefix}'{key}' must be a file path, not {path!r}")
+                continue
+            if not os.path.isfile(path):
+                messages = problems if key in REQUIRED_ASSETS else warnings
+                messages.append(f"{prefix}{key} not found: {path}{suggest_path(path)}")
+            elif probes is not None and path in probes:
+                problem = probe_problem(key, path, probes[path])
+                # Templates only check that extras exist, so broken ones fail the render; music is just dropped
+                if problem:
+                    (warnings if key == 'audio' else problems).append(f"{prefix}{key} {problem}")
+    return problems, warnings
+
+def try_probe(path):
+    """probe_media, or the gist of why it failed (ffmpeg puts it on the last line of a long log)."""
+    try:
+        return probe_media(path)
+    except Exception as e:
+        lines = [line for line in str(e).splitlines() if line.strip()]
+        return lines[-1].replace(f"'{path}'", '').replace(path, '').strip() if lines else type(e).__name__
+
+@tracer.traced(category='load')
+def preflight(data_list, workers=PROBE_WORKERS):
+    """Validate every entry and probe all of its media concurrently, before anything renders.
+    
+    Returns (problems, warnings) per entry. Probe results stay in the probe cache, so the renderers
+    (and the next run) read durations and audio streams from it instead of reopening the files.
+    """
+    paths = sorted({path for data in data_list if isinstance(data, dict)
+                    for path in iter_assets(data) if os.path.isfile(path)})
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths)))) as pool:
+        probes = dict(zip(paths, pool.map(try_probe, paths)))
+    save_probe_cache()
+    return [validate_entry(data, probes) if isinstance(data, dict) else (["entry is not an object"], [])
+            for data in data_list]
+
+def output_format():
+    """The settings use_preview() and --profile change, to hand to worker processes (see start_worker)."""
+    return RESOLUTION, FPS, ENCODING_PROFILE, OUTPUT_SUFFIX
+
+def set_output_format(output_format):
+    global RESOLUTION, FPS, ENCODING_PROFILE, OUTPUT_SUFFIX
+    RESOLUTION, FPS, ENCODING_PROFILE, OUTPUT_SUFFIX = output_format
+
+def use_preview():
+    """Render quick review copies in this process (and the workers it starts) instead of final videos.
+    
+    Layout is expressed in DESIGN_RESOLUTION pixels, so a preview shows exactly what the final render
+    will, at PREVIEW_RESOLUTION and PREVIEW_FPS with the PREVIEW_PROFILE encoding profile.
+    """
+    set_output_format((PREVIEW_RESOLUTION, PREVIEW_FPS, PREVIEW_PROFILE, PREVIEW_SUFFIX))
+
+def run_entry(data):
+    """The entry as this run renders it: encoded with ENCODING_PROFILE unless it names its own encoding, so
+    worker processes and the build manifest see the same settings. With OUTPUT_SUFFIX set it is written
+    beside its final output, always with the run's profile (the entry's own is meant for the final video).
+    """
+    if not isinstance(data, dict):
+        return data
+    data = dict(data)
+    if OUTPUT_SUFFIX and isinstance(data.get('output'), str):
+        root, ext = os.path.splitext(data['output'])
+        data['output'] = f"{root}{OUTPUT_SUFFIX}{ext}"
+        data.pop('encoding', None)
+    data.setdefault('encoding', ENCODING_PROFILE)
+    return data
+
+def iter_input(input_file):
+    """Yield (index, entry) from a JSON list, or lazily line by line from a JSON Lines (.jsonl) file."""
+    if not input_file.lower().endswith(('.jsonl', '.ndjson')):
+        with open(input_file, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        # {"defaults": {...}, "videos": [...]} applies the defaults to every video that does not override them
+        defaults = {}
+        if isinstance(document, dict):
+            defaults, document = document.get('defaults', {}), document.get('videos', [])
+        for idx, data in enumerate(document, 1):
+            yield idx, run_entry({**defaults, **data} if isinstance(data, dict) else data)
+        return
+    with open(input_file, 'r', encoding='utf-8') as f:
+        idx = 0
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            idx += 1
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{input_file}:{line_no}: invalid JSON - {e}") from None
+            yield idx, run_entry(data)
+
+def iter_preflight(input_file):
+    """Yield (index, entry, problems, warnings) for every entry, preflighting PREFLIGHT_BATCH at a time."""
+    entries = iter_input(input_file)
+    while True:
+        batch = list(itertools.islice(entries, PREFLIGHT_BATCH))
+        if not batch:
+            return
+        for (idx, data), (problems, warnings) in zip(batch, preflight([data for _, data in batch])):
+            yield idx, data, problems, warnings
+
+def load_checkpoint(path):
+    """{index: record} of the videos an earlier run finished, from its checkpoint file."""
+    completed = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # last line cut short by the crash
+                completed[record['index']] = record
+    except OSError:
+        pass
+    return completed
+
+def is_completed(record, digest):
+    """True if a checkpoint record still matches the entry and its output is the file that was written."""
+    if not record or record.get('job') != digest or not os.path.isfile(record['output']):
+        return False
+    return file_digest(record['output']) == record['hash']
+
+def plan_input(input_file, force=False):
+    """Validate a JSON or JSON Lines input and report which entries would render, be skipped or fail, without rendering.
+    
+    Only reads file headers, so it runs in a fraction of a second even on large batches.
+    """
+    manifests = {}
+    plan = {'render': [], 'skip': [], 'invalid': []}
+    for idx, data, problems, warnings in iter_preflight(input_file):
+        if problems:
+            status = 'invalid'
+        elif not force and is_up_to_date(data, job_hash(data), manifests):
+            status = 'skip'
+        else:
+            status = 'render'
+        output = data.get('output') if isinstance(data, dict) else None
+        plan[status].append(output)
+        print(f"video {idx} [{data.get('type') if isinstance(data, dict) else None}] {status}: {output}")
+        for message in problems:
+            print(f"  error: {message}")
+        for message in warnings:
+            print(f"  warning: {message}")
+    print(f"\n{len(plan['render'])} to render, {len(plan['skip'])} up to date, {len(plan['invalid'])} invalid")
+    return plan
+
+def process_input(input_file, jobs=1, force=False, chunk_jobs=CHUNK_JOBS, trace=None, resume=False):
+    """Process a JSON or JSON Lines input, optionally rendering jobs in parallel worker processes.
+    
+    All entries are preflighted first; invalid ones are reported up front and fail without rendering.
+    Entries whose output exists and whose job_hash matches the build manifest are skipped unless ``force``.
+    ``chunk_jobs`` > 1 additionally splits each video's segments over that many processes.
+    With ``trace``, stage timings of all processes are written there in Chrome trace-event format.
+    
+    Entries are streamed through both passes, so only the videos in flight are held in memory. Every
+    finished video is appended to the input's checkpoint file; with ``resume`` the entries an interrupted
+    run already finished are skipped (if neither the entry nor the output file changed since).
+    """
+    if trace:
+        tracer.start(trace)
+    # Report every broken entry before spending minutes rendering the ones ahead of it
+    invalid = {}
+    total = 0
+    for idx, data, problems, warnings in iter_preflight(input_file):
+        total = idx
+        for message in warnings:
+            print(f"Warning: video {idx} - {message}")
+        for message in problems:
+            print(f"Error: video {idx} - {message}")
+        if problems:
+            invalid[idx] = f"Preflight: {'; '.join(problems)}"
+    
+    checkpoint = input_file + OUTPUT_SUFFIX + CHECKPOINT_SUFFIX
+    completed = load_checkpoint(checkpoint) if resume else {}
+    manifests = {}
+    skipped = []
+    resumed = []
+    results = []
+    
+    def pending():
+        """Entries that still need rendering, as (idx, data, digest), read lazily from the input."""
+        for idx, data in iter_input(input_file):
+            if idx in invalid:
+                results.append((idx, data.get('output') if isinstance(data, dict) else None, invalid[idx]))
+                continue
+            try:
+                digest = job_hash(data)
+            except OSError as e:
+                print(f"Warning: Could not hash inputs of video {idx} - {e}")
+                digest = None
+            if is_completed(completed.pop(idx, None), digest):
+                resumed.append(data['output'])
+            elif not force and digest and is_up_to_date(data, digest, manifests):
+                skipped.append(data['output'])
+            else:
+                yield idx, data, digest
+    
+    try:
+        checkpoint_file = open(checkpoint, 'a' if resume else 'w', encoding='utf-8')
+    except OSError as e:
+        print(f"Warning: Could not write checkpoint {checkpoint}, --resume will not be able to continue this run - {e}")
+        checkpoint_file = None
+    with checkpoint_file or contextlib.nullcontext():
         
-        final_clip = concatenate_videoclips(all_clips, method="compose")
+        def finish(idx, data, digest, result):
+            _, output, error = result
+            if error is None:
+                if digest:
+                    record_build(data, digest, manifests)
+                if checkpoint_file is not None:
+                    checkpoint_file.write(json.dumps({'index': idx, 'output': output, 'job': digest,
+                                                      'hash': file_digest(output)}) + '\n')
+                    checkpoint_file.flush()
+                    os.fsync(checkpoint_file.fileno())
+            results.append(result)
         
-        if 'audio' in data and os.path.exists(data['audio']):
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=start_worker,
+                                     initargs=(trace, output_format())) as pool:
+                in_flight = {}
+                done = 0
+                for item in itertools.chain(pending(), [None]):
+                    # Keep at most two videos per worker submitted; the rest of the batch stays unread
+                    while in_flight and (item is None or len(in_flight) >= 2 * jobs):
+                        finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            idx, data, digest = in_flight.pop(future)
+                            try:
+                                result = future.result()
+                            except Exception as e:
+                                # The worker process itself died (e.g. killed by the OOM killer)
+                                result = (idx, data.get('output'), f"Worker crashed: {e}")
+                            finish(idx, data, digest, result)
+                            done += 1
+                            status = "done" if result[2] is None else f"FAILED ({result[2]})"
+                            print(f"[{done} finished] video {idx}/{total} {status}: {result[1]}")
+                    if item is not None:
+                        in_flight[pool.submit(render_job, item[0], item[1], chunk_jobs, force)] = item
+        else:
+            for idx, data, digest in pending():
+                print(f"\nGenerating video {idx}/{total}...")
+                result = render_job(idx, data, chunk_jobs, force)
+                if result[2] is not None:
+                    print(f"Error: video {idx} failed - {result[2]}")
+                finish(idx, data, digest, result)
+    
+    results.sort()
+    summary = {
+        'succeeded': [output for idx, output, error in results if error is None],
+        'skipped': skipped,
+        'resumed': resumed,
+        'failed': [{'index': idx, 'output': output, 'error': error} for idx, output, error in results if error is not None],
+    }
+    print(f"\nFinished: {len(summary['succeeded'])} succeeded, {len(skipped)} skipped, "
+          f"{f'{len(resumed)} already done before resuming, ' if resume else ''}{len(summary['failed'])} failed")
+    if jobs <= 1:
+        stats = overlay_cache.stats()
+        print(f"Overlay cache: {stats['hits']} hits ({stats['disk_hits']} from disk), {stats['misses']} misses")
+        print(f"Image cache: {_image_cache_stats['hits']} hits, {_image_cache_stats['misses']} misses")
+    for failure in summary['failed']:
+        print(f"  video {failure['index']} ({failure['output']}): {failure['error']}")
+    if trace:
+        tracer.save()
+        print(f"Trace written to {trace} (open in chrome://tracing or https://ui.perfetto.dev)")
+    return summary
+
+# Render daemon
+def warm_worker(output_format):
+    """Daemon pool initializer: adopt the daemon's output format, and pay for the heavy imports and the
+    font scan once per worker, not per job."""
+    set_output_format(output_format)
+    for module in (np, Image, ImageDraw, ImageFont, ImageFilter, VideoClip, AudioArrayClip, resize):
+        module._load()
+    ffmpeg_binary()
+    build_font_index()
+
+def latency_summary(values):
+    if not values:
+        return None
+    values = sorted(values)
+    pick = lambda q: round(values[min(int(q * len(values)), len(values) - 1)], 3)
+    return {'p50': pick(0.5), 'p95': pick(0.95), 'max': round(values[-1], 3)}
+
+class RenderDaemon:
+    """Job queue in front of a pool of long-lived worker processes.
+
+    The workers outlive individual jobs, so imports, fonts and the overlay, image, audio and probe
+    caches stay warm between submissions. Jobs are handed to the pool only when a worker is free,
+    which keeps queued jobs cancellable.
+    """
+
+    def __init__(self, workers=1, chunk_jobs=CHUNK_JOBS):
+        self.workers = workers
+        self.chunk_jobs = chunk_jobs
+        self.output_format = output_format()
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=warm_worker, initargs=(self.output_format,))
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.slots = threading.Semaphore(workers)
+        self.pending = queue.Queue()
+        self.latencies = deque(maxlen=DAEMON_LATENCY_WINDOW)
+        self.totals = Counter()
+        self.next_id = 1
+        self.started = time.time()
+        threading.Thread(target=self._dispatch, name='dispatcher', daemon=True).start()
+
+    def submit(self, entries):
+        """Preflight entries and queue them as a unit; returns (job records, {entry index: problems})."""
+        entries = [run_entry(data) for data in entries]
+        checks = preflight(entries)
+        problems = {i: found for i, (found, _) in enumerate(checks) if found}
+        if problems:
+            return [], problems
+        jobs = []
+        with self.lock:
+            for data, (_, warnings) in zip(entries, checks):
+                job = {'id': self.next_id, 'status': 'queued', 'type': data.get('type'), 'output': data.get('output'),
+                       'warnings': warnings, 'error': None, 'submitted': time.time(), 'started': None, 'finished': None}
+                self.next_id += 1
+                self.jobs[job['id']] = job
+                self.totals['submitted'] += 1
+                jobs.append(dict(job))
+                self.pending.put((job['id'], data))
+        for job in jobs:
+            print(f"Job {job['id']} queued: {job['output']}")
+        return jobs, {}
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list_jobs(self):
+        with self.lock:
+            return [dict(job) for job in self.jobs.values()]
+
+    def cancel(self, job_id):
+        """Cancel a queued job; returns its record (unchanged if it already started) or None if unknown."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job['status'] == 'queued':
+                job['status'] = 'cancelled'
+                job['finished'] = time.time()
+                self.totals['cancelled'] += 1
+                print(f"Job {job_id} cancelled: {job['output']}")
+            return dict(job)
+
+    def _dispatch(self):
+        while True:
+            job_id, data = self.pending.get()
+            self.slots.acquire()
+            with self.lock:
+                job = self.jobs[job_id]
+                if job['status'] != 'queued':
+                    self.slots.release()
+                    continue
+                job['status'] = 'running'
+                job['started'] = time.time()
             try:
-                audio = AudioFileClip(data['audio'])
-                if audio.duration < final_clip.duration:
-                    num_loops = int(final_clip.duration / audio.duration) + 1
-                    looped_audio = concatenate_videoclips([AudioFileClip(data['audio']).set_duration(audio.duration) for _ in range(num_loops)])
-                    looped_audio = looped_audio.subclip(0, final_clip.duration)
-                    final_clip = final_clip.set_audio(looped_audio)
-                else:
-                    final_clip = final_clip.set_audio(audio.subclip(0, final_clip.duration))
-                audio.close()
-            except Exception as e:
-                print(f"Warning: Could not add audio - {e}")
-        
-        os.makedirs(os.path.dirname(data['output']), exist_ok=True)
-        final_clip.write_videofile(data['output'], codec='libx264', fps=FPS, audio_codec='aac', threads=4)
-        print(f"Opinion video created: {data['output']}")
-    finally:
+                future = self.pool.submit(render_job, job_id, data, self.chunk_jobs)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed by the OOM killer); start a fresh pool for the remaining jobs
+                self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker,
+                                                initargs=(self.output_format,))
+                future = self.pool.submit(render_job, job_id, data, self.chunk_jobs)
+            future.add_done_callback(functools.partial(self._finish, job_id, data))
+
+    def _finish(self, job_id, data, future):
         try:
-            bg_clip.close()
+            _, output, error = future.result()
         except Exception as e:
-            print(f"Warning: Failed to close bg_clip - {e}")
-        if logo_clip:
-            try:
-                logo_clip.close()
-            except Exception as e:
-                print(f"Warning: Failed to close logo_clip - {e}")
+            output, error = data.get('output'), f"Worker crashed: {e}"
+        with self.lock:
+            job = self.jobs[job_id]
+            job['finished'] = time.time()
+            job['status'] = 'failed' if error else 'done'
+            job['error'] = error
+            self.totals[job['status']] += 1
+            self.latencies.append((job['started'] - job['submitted'], job['finished'] - job['started'],
+                                   job['finished'] - job['submitted']))
+            finished = [key for key, old in self.jobs.items() if old['finished'] is not None]
+            for key in finished[:max(0, len(finished) - DAEMON_JOB_HISTORY)]:
+                del self.jobs[key]
+        self.slots.release()
+        if error:
+            print(f"Job {job_id} FAILED ({error}): {output}")
+            return
+        print(f"Job {job_id} done in {job['finished'] - job['started']:.1f}s: {output}")
         try:
-            final_clip.close()
-        except Exception as e:
-            print(f"Warning: Failed to close final_clip - {e}")
+            record_build(data, job_hash(data), {})
+        except OSError as e:
+            print(f"Warning: Could not record build of job {job_id} - {e}")
 
+    def metrics(self):
+        with self.lock:
+            statuses = Counter(job['status'] for job in self.jobs.values())
+            latencies = list(self.latencies)
+            totals = dict(self.totals)
+        uptime = time.time() - self.started
+        return {
+            'uptime_s': round(uptime, 1),
+            'workers': self.workers,
+            'queued': statuses['queued'],
+            'running': statuses['running'],
+            'totals': totals,
+            'throughput_per_min': round(totals.get('done', 0) / uptime * 60, 2),
+            'queue_wait_s': latency_summary([wait for wait, _, _ in latencies]),
+            'render_s': latency_summary([render for _, render, _ in latencies]),
+            'latency_s': latency_summary([total for _, _, total in latencies]),
+        }
 
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
 
+def serve(host=DAEMON_HOST, port=DAEMON_PORT, workers=1, chunk_jobs=CHUNK_JOBS):
+    """Run the render daemon until interrupted.
 
+    POST /jobs          queue an input entry, or a list of them (same format as input.json) -> 202
+    GET  /jobs          all known jobs; GET /jobs/<id> one job
+    DELETE /jobs/<id>   cancel a job that has not started
+    GET  /metrics       job counts, throughput and queue-wait/render/total latency percentiles
+    """
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    daemon = RenderDaemon(workers, chunk_jobs)
 
+    class Handler(BaseHTTPRequestHandler):
+        def reply(self, status, payload):
+            body = json.dumps(payload, indent=2, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
 
+        def job_id(self):
+            parts = self.path.strip('/').split('/')
+            return int(parts[1]) if len(parts) == 2 and parts[0] == 'jobs' and parts[1].isdigit() else None
 
+        def do_GET(self):
+            if self.path.rstrip('/') == '/metrics':
+                return self.reply(200, daemon.metrics())
+            if self.path.rstrip('/') == '/jobs':
+                return self.reply(200, daemon.list_jobs())
+            job = daemon.get(self.job_id())
+            self.reply(200, job) if job else self.reply(404, {'error': 'unknown job'})
 
+        def do_POST(self):
+            if self.path.rstrip('/') != '/jobs':
+                return self.reply(404, {'error': 'unknown endpoint'})
+            try:
+                entries = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'null')
+            except ValueError as e:
+                return self.reply(400, {'error': f"invalid JSON - {e}"})
+            single = isinstance(entries, dict)
+            entries = [entries] if single else entries
+            if not isinstance(entries, list) or not entries or not all(isinstance(data, dict) for data in entries):
+                return self.reply(400, {'error': "expected an input entry or a list of them"})
+            jobs, problems = daemon.submit(entries)
+            if problems:
+                return self.reply(400, {'error': 'invalid entries', 'problems': problems})
+            self.reply(202, jobs[0] if single else jobs)
 
+        def do_DELETE(self):
+            job = daemon.cancel(self.job_id())
+            if job is None:
+                return self.reply(404, {'error': 'unknown job'})
+            self.reply(200 if job['status'] == 'cancelled' else 409, job)
 
-# Process input and GUI functions
-def process_input(input_file):
-    """Process JSON input."""
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data_list = json.load(f)
-    
-    for idx, data in enumerate(data_list, 1):
-        print(f"\nGenerating video {idx}/{len(data_list)}...")
-        video_type = data.get('type')
-        
-        if video_type == 'quiz':
-            create_quiz_video(data)
-        elif video_type == 'fact':
-            create_fact_video(data)
-        elif video_type == 'emoji_guess':
-            create_emoji_guess_video(data)
-        elif video_type == 'character_reveal':
-            create_character_reveal_video(data)
-        elif video_type == 'minimalist_challenge':
-            create_minimalist_challenge_video(data)
-        elif video_type == 'then_now':
-            create_then_now_video(data)
-        elif video_type == 'opinion':
-            create_opinion_video(data)
-        else:
-            print(f"Unknown video type: {video_type}")
+        def log_message(self, format, *args):
+            pass  # job events are printed by the daemon
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Render daemon listening on http://{host}:{server.server_address[1]} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.close()
 
 def run_gui():
     """Simple GUI."""
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
     root = tk.Tk()
     root.title("YouTube Shorts Generator")
     root.geometry("400x150")
@@ -988,11 +2810,15 @@ def run_gui():
     tk.Label(root, text="Select Input JSON File").pack()
     
     def browse_file():
-        file_path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
+        file_path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json"), ("JSON Lines files", "*.jsonl")])
         if file_path:
             try:
-                process_input(file_path)
-                messagebox.showinfo("Success", "Videos generated successfully!")
+                summary = process_input(file_path)
+                if summary['failed']:
+                    messagebox.showwarning("Finished with errors",
+                                           f"{len(summary['succeeded'])} videos generated, {len(summary['failed'])} failed. See console for details.")
+                else:
+                    messagebox.showinfo("Success", "Videos generated successfully!")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed: {str(e)}")
     
@@ -1001,8 +2827,40 @@ def run_gui():
     root.mainloop()
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) > 1:
-        process_input(sys.argv[1])
+    import argparse
+    parser = argparse.ArgumentParser(description="YouTube Shorts video generator")
+    parser.add_argument('input_file', nargs='?', help="JSON or JSON Lines (.jsonl) input file (opens the GUI when omitted)")
+    parser.add_argument('--jobs', '-j', type=int, default=1, help="number of videos to render in parallel")
+    parser.add_argument('--chunk-jobs', type=int, default=CHUNK_JOBS,
+                        help="number of processes sharing the segments of each video (for long videos)")
+    parser.add_argument('--force', action='store_true', help="re-render videos even if the build manifest says they are up to date")
+    parser.add_argument('--trace', metavar='OUT_JSON', help="write per-stage timings as a Chrome trace-event file")
+    parser.add_argument('--check', action='store_true',
+                        help="validate the input and show what would be rendered or skipped, without rendering")
+    parser.add_argument('--preview', action='store_true',
+                        help=f"render quick {PREVIEW_RESOLUTION[0]}x{PREVIEW_RESOLUTION[1]} {PREVIEW_FPS}fps previews "
+                             f"to <output>{PREVIEW_SUFFIX}.mp4 instead of the final videos")
+    parser.add_argument('--profile', choices=list(ENCODING_PROFILES), default=ENCODING_PROFILE,
+                        help="encoding profile for entries that do not set \"encoding\" themselves")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip the videos an interrupted run of the same input already finished")
+    parser.add_argument('--serve', action='store_true',
+                        help="run as a render daemon taking jobs over HTTP (--jobs sets the number of workers)")
+    parser.add_argument('--host', default=DAEMON_HOST, help="address the daemon listens on")
+    parser.add_argument('--port', type=int, default=DAEMON_PORT, help="port the daemon listens on")
+    args = parser.parse_args()
+    ENCODING_PROFILE = args.profile
+    if args.preview:
+        use_preview()
+    if args.serve:
+        serve(args.host, args.port, workers=args.jobs, chunk_jobs=args.chunk_jobs)
+    elif args.input_file and args.check:
+        if plan_input(args.input_file, force=args.force)['invalid']:
+            raise SystemExit(1)
+    elif args.input_file:
+        summary = process_input(args.input_file, jobs=args.jobs, force=args.force, chunk_jobs=args.chunk_jobs,
+                                trace=args.trace, resume=args.resume)
+        if summary['failed']:
+            raise SystemExit(1)
     else:
         run_gui()
\ No newline at end of file